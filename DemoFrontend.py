@@ -1,7 +1,7 @@
 import flet as ft
-import requests
-import json
-from datetime import datetime, timezone
+from datetime import datetime
+from frontend.api_client import ApiClient
+from frontend.fake_api import FakeApi, FakeDataset
 
 API_BASE_URL = "http://localhost:5432/api"
 
@@ -35,29 +35,10 @@ class NoteSharingApp:
         self.page.dark_theme = ft.Theme(color_scheme_seed="indigo")
         self.page.theme_mode = ft.ThemeMode.SYSTEM
         
+        self.client = ApiClient(API_BASE_URL)
         self.is_demo_mode = False
         self.test_user = {"username": "testuser", "password": "password123", "user_id": 99}
-        self._demo_data = {
-            "groups": [
-                {'id': 101, 'name': 'Calculus Crew', 'course_code': 'MATH-101', 'member_count': 4, 'join_code': 'CALC-ABC'},
-                {'id': 102, 'name': 'Physics Phantoms', 'course_code': 'PHY-203', 'member_count': 2, 'join_code': 'PHYS-XYZ'}
-            ],
-            101: {
-                "notes": [
-                    {'title': 'Chapter 1: Limits', 'content': 'Remember to review L\'Hôpital\'s rule.'},
-                    {'title': 'Useful Link for Derivatives', 'content': 'https://www.mathsisfun.com/calculus/derivatives-rules.html'}
-                ],
-                "meetups": [
-                    {'topic': 'Midterm Review Session', 'time': datetime.now(timezone.utc).isoformat(), 'description': 'Covering chapters 1-4. Bring questions!', 'link': 'https://zoom.us/j/1234567890'},
-                    {'topic': 'Problem Set 5 Walkthrough', 'time': '2024-12-27T19:30:00Z', 'description': 'We will work through the tough questions together.', 'link': ''}
-                ],
-                "chat": [
-                    {'author': 'Alice', 'text': 'Hey everyone, ready for the midterm?'},
-                    {'author': self.test_user['username'], 'text': 'I am! Just need to review chapter 3.'},
-                    {'author': 'Bob', 'text': 'Same here. That section on related rates is tricky.'}
-                ]
-            }
-        }
+        self.demo_api = FakeApi(FakeDataset.demo(self.test_user["username"]))
 
         self.current_group_id = None; self.current_group_name = ""
         self.all_notes = []; self.all_meetups = []
@@ -76,42 +57,8 @@ class NoteSharingApp:
         self.page.go("/login")
 
     def api_call(self, method, endpoint, data=None):
-        if self.is_demo_mode:
-            print(f"DEMO MODE: Intercepting API call for {method} {endpoint}")
-            group_id = self.current_group_id
-            
-            if method == 'GET' and endpoint == '/groups':
-                return self._demo_data["groups"], None
-            if method == 'GET' and endpoint == f'/groups/{group_id}':
-                 return next((g for g in self._demo_data["groups"] if g['id'] == group_id), None), None
-            if method == 'GET' and endpoint.endswith('/notes'):
-                return self._demo_data.get(group_id, {}).get("notes", []), None
-            if method == 'GET' and endpoint.endswith('/meetups'):
-                return self._demo_data.get(group_id, {}).get("meetups", []), None
-            if method == 'GET' and endpoint.endswith('/chat'):
-                return self._demo_data.get(group_id, {}).get("chat", []), None
-            if method == 'POST': 
-                if endpoint.endswith('/chat') and data:
-                    self._demo_data[group_id]["chat"].append({'author': self.test_user['username'], 'text': data['text']})
-                print(f"DEMO MODE: Successfully handled POST to {endpoint}")
-                return {"success": True}, None
-            return [], None 
-
-        token = self.page.client_storage.get("auth_token")
-        headers = {'Authorization': f'Bearer {token}'} if token else {}
-        headers['Content-Type'] = 'application/json'
-        try:
-            response = requests.request(method.upper(), url=f"{API_BASE_URL}{endpoint}", json=data, headers=headers)
-            response.raise_for_status()
-            return (response.json() if response.content else {"success": True}), None
-        except requests.exceptions.RequestException as e:
-            error_message = f"API Error: {e}"
-            if e.response is not None:
-                try: 
-                    error_data = e.response.json()
-                    error_message = error_data.get('message', error_data.get('msg', str(e)))
-                except json.JSONDecodeError: pass
-            return None, error_message
+        if self.is_demo_mode: return self.demo_api.request(method, endpoint, data)
+        return self.client.request(method, endpoint, data, token=self.page.client_storage.get("auth_token"))
 
     def show_error_dialog(self, message: str):
         error_dialog = ft.AlertDialog(
@@ -238,19 +185,21 @@ class NoteSharingApp:
         self.page.update()
 
     def load_group_notes(self):
-        self.all_notes, _ = self.api_call('GET', f'/groups/{self.current_group_id}/notes')
-        self.populate_notes_list(self.all_notes or [])
+        page, _ = self.api_call('GET', f'/groups/{self.current_group_id}/notes')
+        self.all_notes = page['items'] if page else []
+        self.populate_notes_list(self.all_notes)
 
     def load_group_meetups(self):
-        self.all_meetups, _ = self.api_call('GET', f'/groups/{self.current_group_id}/meetups')
-        self.populate_meetups_list(self.all_meetups or [])
+        page, _ = self.api_call('GET', f'/groups/{self.current_group_id}/meetups')
+        self.all_meetups = page['items'] if page else []
+        self.populate_meetups_list(self.all_meetups)
 
     def load_group_chat(self):
         self.chat_list.controls.clear()
-        data, _ = self.api_call('GET', f'/groups/{self.current_group_id}/chat')
-        if data:
+        page, _ = self.api_call('GET', f'/groups/{self.current_group_id}/chat')
+        if page:
             current_username = self.page.client_storage.get("username")
-            for msg in data: self.chat_list.controls.append(ChatBubble(author=msg['author'], text=msg['text'], is_me=(current_username == msg['author'])))
+            for msg in page['items']: self.chat_list.controls.append(ChatBubble(author=msg['author'], text=msg['text'], is_me=(current_username == msg['author'])))
         self.page.update()
 
     def load_dashboard_groups(self):
@@ -396,6 +345,7 @@ class NoteSharingApp:
     
     def logout(self, e): 
         self.is_demo_mode = False
+        self.client.clear_cache()
         self.page.client_storage.clear()
         self.page.go("/login")
 
@@ -420,10 +370,7 @@ class NoteSharingApp:
             elif self.page.route.startswith("/group/"):
                 parts = self.page.route.strip("/").split("/")
                 self.current_group_id = int(parts[1])
-                if self.is_demo_mode:
-                    group_info = next((g for g in self._demo_data["groups"] if g['id'] == self.current_group_id), None)
-                    if group_info: self.current_group_name = group_info['name']
-                elif not self.current_group_name or str(self.current_group_id) != parts[1]: 
+                if not self.current_group_name or str(self.current_group_id) != parts[1]: 
                     group_data, _ = self.api_call('GET', f'/groups/{self.current_group_id}')
                     if group_data: self.current_group_name = group_data.get('name', 'Group')
 
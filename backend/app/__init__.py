@@ -4,15 +4,29 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager 
 from .config import Config
 from .models import db, bcrypt
+from .cache import response_cache
+from .database import configure_engines
+from .events import broker
+from .hashing import hashing_pool
+from .json_provider import FastJSONProvider
+from .membership import membership
+from .metrics import metrics
 from .routes import api_bp
 
 def create_app(config_class=Config):
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.config.from_object(config_class)
     app.config["JWT_SECRET_KEY"] = app.config["SECRET_KEY"]
 
+    configure_engines(app)
     db.init_app(app)
     bcrypt.init_app(app)
+    hashing_pool.init_app(app)
+    broker.init_app(app)
+    response_cache.init_app(app)
+    membership.init_app(app)
+    metrics.init_app(app)
     jwt = JWTManager(app) 
     migrate = Migrate(app, db)
     CORS(app) 
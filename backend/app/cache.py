@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, g, make_response, request
+from flask_jwt_extended import get_jwt_identity
+
+# Server-side cache of serialized read responses.
+#
+# Entries are keyed by the request path (so by group and page) plus the version
+# counters that @conditional already looked up, which makes them safe to share
+# between processes: a write anywhere bumps the version and the old entries are
+# never read again. The write routes additionally invalidate the affected group
+# collections, so this process frees those entries at once instead of waiting for
+# LRU or TTL eviction.
+
+class NullCacheBackend:
+    evictions = 0
+    def __len__(self): return 0
+    def get(self, key): return None
+    def set(self, key, body, tags): pass
+    def invalidate(self, tags): pass
+
+class MemoryCacheBackend:
+    """In-process LRU of response bodies with a TTL and entry/byte limits."""
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttl=60):
+        self.max_entries, self.max_bytes, self.ttl = max_entries, max_bytes, ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, body, tags)
+        self._tags = {}                # tag -> keys
+        self.size = 0
+        self.evictions = 0
+
+    def __len__(self): return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None: return None
+            if entry[0] < time.monotonic():
+                self._drop(key); self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, body, tags):
+        if len(body) > self.max_bytes: return
+        with self._lock:
+            if key in self._entries: self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, body, tags); self.size += len(body)
+            for tag in tags: self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._drop(next(iter(self._entries))); self.evictions += 1
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())): self._drop(key)
+
+    def _drop(self, key):
+        _, body, tags = self._entries.pop(key); self.size -= len(body)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is None: continue
+            keys.discard(key)
+            if not keys: del self._tags[tag]
+
+def group_tag(group_id, collection): return f"group:{group_id}:{collection}"
+def user_tag(user_id): return f"user:{user_id}:groups"
+
+class ResponseCache:
+    """Application-wide response cache, backed by ``RESPONSE_CACHE_BACKEND``."""
+
+    def __init__(self):
+        self.backend = NullCacheBackend()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def init_app(self, app):
+        if app.config['RESPONSE_CACHE_BACKEND'] == 'memory':
+            self.backend = MemoryCacheBackend(app.config['RESPONSE_CACHE_MAX_ENTRIES'], app.config['RESPONSE_CACHE_MAX_BYTES'], app.config['RESPONSE_CACHE_TTL'])
+        else:
+            self.backend = NullCacheBackend()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.backend.evictions, 'entries': len(self.backend)}
+
+    def invalidate_group(self, group_id, *collections): self.backend.invalidate([group_tag(group_id, c) for c in collections])
+    def invalidate_user(self, user_id): self.backend.invalidate([user_tag(user_id)])
+
+    def cached(self, *collections, per_user=False):
+        """Serve a 200 response from the cache; must sit under @conditional, which supplies the version."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                version = g.get('resource_version')
+                if version is None: return view(*args, **kwargs)
+                key = f"{request.full_path}|{version}"
+                tags = [group_tag(kwargs['group_id'], c) for c in collections]
+                if per_user: key += f"|{get_jwt_identity()}"; tags.append(user_tag(get_jwt_identity()))
+                body = self.backend.get(key)
+                with self._lock:
+                    if body is None: self.misses += 1
+                    else: self.hits += 1
+                if body is not None: return current_app.response_class(body, mimetype='application/json')
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200: self.backend.set(key, response.get_data(), tags)
+                return response
+            return wrapper
+        return decorator
+
+response_cache = ResponseCache()
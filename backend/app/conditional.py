@@ -0,0 +1,47 @@
+import hashlib
+from datetime import datetime
+from functools import wraps
+from flask import g, request, make_response, current_app
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import func
+from .models import db, User, Group, group_members
+
+# Conditional GET: each read endpoint names a cheap version lookup (one indexed
+# row) and is skipped entirely with a 304 when the client already holds that
+# version of the response.
+
+def group_collection_version(*collections, daily=False):
+    columns = [getattr(Group, f'{c}_version') for c in collections]
+    def version(group_id):
+        row = db.session.query(*columns).filter(Group.id == group_id).first()
+        # Responses that start at today's date (upcoming meetups) also change at midnight.
+        return (row and (*row, datetime.utcnow().date())) if daily else row
+    return version
+
+def user_groups_version():
+    # groups_version changes whenever the user's set of groups does; while it is
+    # fixed, the sum of the groups' members_version only ever grows.
+    return (db.session.query(User.groups_version, func.coalesce(func.sum(Group.members_version), 0))
+            .outerjoin(group_members, group_members.c.user_id == User.id)
+            .outerjoin(Group, Group.id == group_members.c.group_id)
+            .filter(User.id == int(get_jwt_identity()))
+            .group_by(User.id)
+            .first())
+
+def conditional(version_of):
+    """Answer If-None-Match with 304 when ``version_of(**view_args)`` is unchanged."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = g.resource_version = version_of(**kwargs)
+            if version is None: return view(*args, **kwargs)
+            etag = hashlib.sha1(f"{get_jwt_identity()}|{request.full_path}|{version}".encode()).hexdigest()
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200: return response
+            response.set_etag(etag, weak=True)
+            return response
+        return wrapper
+    return decorator
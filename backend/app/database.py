@@ -0,0 +1,67 @@
+import time
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# Engine and pool configuration.
+#
+# configure_engines() turns the DATABASE_* settings into SQLALCHEMY_ENGINE_OPTIONS
+# (and a 'replica' bind when DATABASE_REPLICA_URL is set) before the engines are
+# created. Server databases get a TimedQueuePool, which records how long each
+# checkout waited so metrics can report pool pressure. SQLite keeps the pools
+# Flask-SQLAlchemy picks for it, which take none of these options.
+#
+# With a replica configured, RoutingSession sends the reads of GET requests there;
+# writes, flushes and everything outside a request use the primary. Replica reads
+# can lag the primary, so checks that must see a write made elsewhere (membership)
+# pin themselves to the primary.
+
+REPLICA = 'replica'
+
+class TimedQueuePool(QueuePool):
+    """A QueuePool that reports each checkout's wait to ``on_checkout(seconds, timed_out)``."""
+
+    on_checkout = None
+
+    def __init__(self, creator, pool_size=5, max_overflow=10, **kw):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+        self.capacity = pool_size + max_overflow if max_overflow >= 0 else None  # None: unbounded overflow
+
+    def connect(self):
+        started = time.perf_counter()
+        try: connection = super().connect()
+        except exc.TimeoutError:
+            if self.on_checkout: self.on_checkout(time.perf_counter() - started, True)
+            raise
+        if self.on_checkout: self.on_checkout(time.perf_counter() - started, False)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate(); pool.on_checkout = self.on_checkout
+        return pool
+
+def engine_options(config, uri):
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite': return {}
+    options = {'poolclass': TimedQueuePool, 'pool_size': config['DATABASE_POOL_SIZE'], 'max_overflow': config['DATABASE_MAX_OVERFLOW'],
+               'pool_timeout': config['DATABASE_POOL_TIMEOUT'], 'pool_pre_ping': config['DATABASE_POOL_PRE_PING'], 'pool_recycle': config['DATABASE_POOL_RECYCLE']}
+    if config['DATABASE_STATEMENT_TIMEOUT_MS'] and url.get_backend_name() == 'postgresql':
+        options['connect_args'] = {'options': f"-c statement_timeout={config['DATABASE_STATEMENT_TIMEOUT_MS']}"}
+    return options
+
+def configure_engines(app):
+    """Fill in engine options from the DATABASE_* settings; options set explicitly in the config win."""
+    config = app.config
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = {**engine_options(config, config['SQLALCHEMY_DATABASE_URI']), **config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}
+    if config['DATABASE_REPLICA_URL']:
+        config['SQLALCHEMY_BINDS'] = {**config.get('SQLALCHEMY_BINDS', {}),
+                                      REPLICA: {'url': config['DATABASE_REPLICA_URL'], **engine_options(config, config['DATABASE_REPLICA_URL'])}}
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica = self._db.engines.get(REPLICA) if bind is None and has_request_context() else None
+        if replica is not None and request.method in ('GET', 'HEAD') and not self._flushing and not getattr(clause, 'is_dml', False):
+            return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,204 @@
+import collections
+import json
+import logging
+import os
+import select
+import threading
+import time
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from .models import db
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more.
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+# Events are published inside the write's transaction, before db.session.commit(),
+# and reach subscribers only if that commit succeeds: Postgres holds a NOTIFY until
+# commit, and the in-process backend parks events on the session until then.
+
+@event.listens_for(Session, 'after_commit')
+def _deliver_pending_events(session):
+    for backend, channel, event_type, data in session.info.pop('pending_events', ()): backend._fan_out(channel, event_type, data)
+
+@event.listens_for(Session, 'after_transaction_end')
+def _drop_pending_events(session, transaction):
+    # Runs after after_commit; whatever is left belongs to a rolled back or closed transaction.
+    if transaction.parent is None: session.info.pop('pending_events', None)
+
+class Subscription:
+    """A bounded event queue for one stream client.
+
+    When a slow consumer lets ``maxsize`` events pile up, the backlog is coalesced
+    into a single ``resync`` event telling the client to refetch instead of
+    buffering without limit.
+    """
+
+    def __init__(self, maxsize):
+        self._events = collections.deque()
+        self._maxsize = maxsize
+        self._dropped = 0
+        self._cond = threading.Condition()
+
+    def put(self, event_type, data):
+        with self._cond:
+            if self._dropped or len(self._events) >= self._maxsize:
+                self._dropped += len(self._events) + 1
+                self._events.clear()
+            else:
+                self._events.append((event_type, data))
+            self._cond.notify()
+
+    def get(self, timeout):
+        """Return the next ``(event_type, data)``, or None if ``timeout`` elapses first."""
+        with self._cond:
+            if not self._events and not self._dropped: self._cond.wait(timeout)
+            if self._dropped:
+                dropped, self._dropped = self._dropped, 0
+                return 'resync', {'dropped': dropped}
+            return self._events.popleft() if self._events else None
+
+class InProcessEventBackend:
+    """Fan-out to subscribers of the current process only."""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, channel):
+        subscription = Subscription(self.queue_size)
+        with self._lock: self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, channel, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is None: return
+            subscribers.discard(subscription)
+            if not subscribers: del self._subscribers[channel]
+
+    def publish(self, channel, event_type, data):
+        db.session.info.setdefault('pending_events', []).append((self, channel, event_type, data))
+
+    def _fan_out(self, channel, event_type, data):
+        with self._lock: subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers: subscription.put(event_type, data)
+
+    def _channels(self):
+        with self._lock: return set(self._subscribers)
+
+class PostgresEventBackend(InProcessEventBackend):
+    """Fan-out across processes and hosts through Postgres LISTEN/NOTIFY.
+
+    Each group is its own NOTIFY channel. A listener thread per process keeps a
+    dedicated connection LISTENing on exactly the groups that have local
+    subscribers and hands incoming notifications to them.
+    """
+
+    def __init__(self, database_uri, queue_size=100):
+        super().__init__(queue_size)
+        self._dsn = make_url(database_uri).set(drivername='postgresql').render_as_string(hide_password=False)
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_w, False)
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    @staticmethod
+    def channel_name(channel):
+        return f"peerstudy_group_{channel}"
+
+    def subscribe(self, channel):
+        subscription = super().subscribe(channel)
+        self._start_listener()
+        self._wake()
+        return subscription
+
+    def unsubscribe(self, channel, subscription):
+        super().unsubscribe(channel, subscription)
+        self._wake()
+
+    def _wake(self):
+        try: os.write(self._wake_w, b'\0')
+        except BlockingIOError: pass
+
+    def publish(self, channel, event_type, data):
+        payload = json.dumps({'channel': channel, 'type': event_type, 'data': data})
+        if len(payload.encode()) > NOTIFY_PAYLOAD_LIMIT:
+            payload = json.dumps({'channel': channel, 'type': 'resync', 'data': {}})
+        db.session.execute(text("SELECT pg_notify(:channel, :payload)"), {'channel': self.channel_name(channel), 'payload': payload})
+
+    def _start_listener(self):
+        with self._listener_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='pg-event-listener', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        import psycopg2
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(self._dsn)
+                self._listen_once(conn)
+            except psycopg2.Error as e:
+                logger.warning("Event listener connection lost: %s", e)
+                # Notifications sent while disconnected are gone; make every client refetch.
+                for channel in self._channels(): self._fan_out(channel, 'resync', {})
+                time.sleep(1)
+            finally:
+                if conn is not None: conn.close()
+
+    def _listen_once(self, conn):
+        conn.autocommit = True
+        listening = set()
+        with conn.cursor() as cursor:
+            while True:
+                wanted = self._channels()
+                for channel in wanted - listening: cursor.execute(f'LISTEN "{self.channel_name(channel)}"')
+                for channel in listening - wanted: cursor.execute(f'UNLISTEN "{self.channel_name(channel)}"')
+                listening = wanted
+                readable, _, _ = select.select([conn, self._wake_r], [], [], 30)
+                if self._wake_r in readable: os.read(self._wake_r, 4096)
+                conn.poll()
+                while conn.notifies:
+                    event = json.loads(conn.notifies.pop(0).payload)
+                    self._fan_out(event['channel'], event['type'], event['data'])
+
+class EventBroker:
+    """Application-wide entry point for group events, backed by ``EVENT_BACKEND``."""
+
+    def __init__(self):
+        self.backend = InProcessEventBackend()
+
+    def init_app(self, app):
+        queue_size = app.config['EVENT_QUEUE_SIZE']
+        if app.config['EVENT_BACKEND'] == 'postgres':
+            self.backend = PostgresEventBackend(app.config['SQLALCHEMY_DATABASE_URI'], queue_size)
+        else:
+            self.backend = InProcessEventBackend(queue_size)
+
+    def subscribe(self, channel): return self.backend.subscribe(channel)
+    def unsubscribe(self, channel, subscription): self.backend.unsubscribe(channel, subscription)
+    def publish(self, channel, event_type, data):
+        """Send an event to ``channel`` when the current transaction commits."""
+        self.backend.publish(channel, event_type, data)
+
+broker = EventBroker()
+
+def sse_stream(channel, keepalive):
+    """Yield Server-Sent Events for ``channel`` until the client disconnects."""
+    subscription = broker.subscribe(channel)
+    try:
+        yield ': connected\n\n'
+        while True:
+            event = subscription.get(timeout=keepalive)
+            if event is None:
+                yield ': keepalive\n\n'
+                continue
+            event_type, data = event
+            yield f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+    finally:
+        broker.unsubscribe(channel, subscription)
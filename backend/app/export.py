@@ -0,0 +1,20 @@
+from .json_provider import dumps_line as dumps
+from .sync import SYNCED, latest_token
+
+# Streaming export of a whole group as JSON Lines. Rows are read with yield_per,
+# a server-side cursor on Postgres, and written out batch by batch, so memory use
+# depends on the batch size and not on the size of the group.
+
+def export_lines(group_id, group, collections, batch_size):
+    """Yield NDJSON chunks: a ``group`` header carrying a sync token, then one line per row."""
+    # The token is read before any rows: anything written during the export is
+    # picked up by a later /sync from it.
+    yield dumps({'type': 'group', 'token': str(latest_token(group_id)), 'data': group}) + '\n'
+    for collection in collections:
+        model, query, serialize = SYNCED[collection]
+        lines = []
+        for row in query(group_id).order_by(model.id).yield_per(batch_size):
+            lines.append(dumps({'type': collection, 'data': serialize(row)}))
+            if len(lines) >= batch_size:
+                yield '\n'.join(lines) + '\n'; lines = []
+        if lines: yield '\n'.join(lines) + '\n'
@@ -0,0 +1,32 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class HashingPoolBusy(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Password hashing pool is saturated")
+        self.retry_after = retry_after
+
+class HashingPool:
+    """Runs bcrypt on a fixed number of threads and refuses work past a queue limit.
+
+    Without ``init_app`` (e.g. in migration scripts) calls run inline.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._slots = None
+        self.retry_after = 1
+
+    def init_app(self, app):
+        workers, depth = app.config['BCRYPT_POOL_SIZE'], app.config['BCRYPT_QUEUE_DEPTH']
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + depth)
+        self.retry_after = app.config['BCRYPT_RETRY_AFTER']
+
+    def run(self, fn, *args):
+        if self._executor is None: return fn(*args)
+        if not self._slots.acquire(blocking=False): raise HashingPoolBusy(self.retry_after)
+        try: return self._executor.submit(fn, *args).result()
+        finally: self._slots.release()
+
+hashing_pool = HashingPool()
@@ -0,0 +1,81 @@
+import json
+from datetime import datetime
+from sqlalchemy import insert
+from .models import db, Note, Meetup, ChatMessage, record_changes
+
+# Bulk import of notes, meetups and chat messages into one group.
+#
+# Every item is validated before anything is written; if any item is invalid the
+# whole import is rejected with the list of errors. Valid imports are inserted
+# with one multi-row INSERT ... RETURNING per collection and a single change-log
+# write per collection, all in one transaction.
+
+class InvalidItem(ValueError):
+    pass
+
+def _text(item, field, required=True, max_length=None):
+    value = item.get(field)
+    if value is None and not required: return ''
+    if not isinstance(value, str) or (required and not value.strip()): raise InvalidItem(f"'{field}' is required")
+    if max_length and len(value) > max_length: raise InvalidItem(f"'{field}' is longer than {max_length} characters")
+    return value
+
+def _time(item, field, required=True):
+    value = item.get(field)
+    if value is None and not required: return None
+    try: return datetime.fromisoformat(value)
+    except (TypeError, ValueError): raise InvalidItem(f"'{field}' must be an ISO 8601 date-time") from None
+
+def note_row(item, user_id, group_id):
+    row = {'title': _text(item, 'title', max_length=150), 'content': _text(item, 'content', required=False), 'uploader_id': user_id, 'group_id': group_id}
+    created_at = _time(item, 'created_at', required=False)
+    return {**row, 'created_at': created_at} if created_at else row
+
+def meetup_row(item, user_id, group_id):
+    return {'topic': _text(item, 'topic', max_length=200), 'scheduled_time': _time(item, 'time'), 'description': _text(item, 'description', required=False),
+            'meetup_link': _text(item, 'link', required=False, max_length=255), 'creator_id': user_id, 'group_id': group_id}
+
+def chat_message_row(item, user_id, group_id):
+    row = {'text': _text(item, 'text'), 'user_id': user_id, 'group_id': group_id}
+    timestamp = _time(item, 'timestamp', required=False)
+    return {**row, 'timestamp': timestamp} if timestamp else row
+
+IMPORTABLE = {'notes': (Note, note_row), 'meetups': (Meetup, meetup_row), 'chat': (ChatMessage, chat_message_row)}
+
+def read_items(request):
+    """``(location, collection, item)`` triples from a JSON body of arrays or an NDJSON upload."""
+    if request.mimetype == 'application/x-ndjson':
+        # The format written by /export; its group header line is skipped.
+        for number, line in enumerate(request.stream, 1):
+            if not line.strip(): continue
+            try: record = json.loads(line)
+            except ValueError: record = None
+            if not isinstance(record, dict): yield {'line': number}, None, None; continue
+            if record.get('type') != 'group': yield {'line': number}, record.get('type'), record.get('data')
+        return
+    data = request.get_json(force=True, silent=True)
+    if not isinstance(data, dict): yield {}, None, None; return
+    for collection, items in data.items():
+        if not isinstance(items, list): yield {'collection': collection}, collection, None; continue
+        for index, item in enumerate(items): yield {'collection': collection, 'index': index}, collection, item
+
+def import_items(group_id, user_id, items, max_items):
+    """Validate and insert ``items``; returns ``(inserted ids per collection, errors)``."""
+    rows = {c: [] for c in IMPORTABLE}; errors = []
+    for count, (location, collection, item) in enumerate(items, 1):
+        if count > max_items:
+            errors.append({'message': f'An import is limited to {max_items} items'}); break
+        try:
+            if collection not in IMPORTABLE: raise InvalidItem('Unknown or missing item type')
+            if not isinstance(item, dict): raise InvalidItem('Item must be an object')
+            rows[collection].append(IMPORTABLE[collection][1](item, user_id, group_id))
+        except InvalidItem as e:
+            errors.append({**location, 'message': str(e)})
+    if errors: return None, errors
+    inserted = {}
+    for collection, collection_rows in rows.items():
+        if not collection_rows: continue
+        model = IMPORTABLE[collection][0]
+        inserted[collection] = sorted(db.session.scalars(insert(model).returning(model.id), collection_rows))
+        record_changes(group_id, collection, inserted[collection])
+    return inserted, []
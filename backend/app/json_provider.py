@@ -0,0 +1,41 @@
+import datetime
+import json
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(o):
+    if isinstance(o, (datetime.date, datetime.time)): return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+def dumps_line(obj):
+    """Compact single-line JSON for NDJSON output, whatever the app's JSON or debug settings."""
+    if orjson is not None: return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, default=_default, separators=(',', ':'))
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes with orjson when it is importable, else with the stdlib.
+
+    Dates and datetimes are written as ISO 8601 on both paths (orjson does so
+    natively; Flask's default would write HTTP dates), so responses carry the same
+    data whichever encoder is in use.
+    """
+
+    default = staticmethod(_default)
+
+    def _options(self, pretty=False):
+        return orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if self.sort_keys else 0) | (orjson.OPT_INDENT_2 if pretty else 0)
+
+    def dumps(self, obj, **kwargs):
+        # Always compact, like DefaultJSONProvider.dumps; only response() pretty-prints.
+        if orjson is None or kwargs: return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def response(self, *args, **kwargs):
+        if orjson is None: return super().response(*args, **kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(self._prepare_response_obj(args, kwargs), default=self.default, option=self._options(pretty))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
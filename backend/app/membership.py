@@ -0,0 +1,53 @@
+import threading
+import time
+from functools import wraps
+from flask import jsonify
+from flask_jwt_extended import get_jwt_identity
+from .models import db, group_members
+
+# Group membership checks for the /groups/<id>/... routes.
+#
+# Each process caches, per user, the set of group ids they belong to, read from
+# group_members by primary-key prefix. A cached "not a member" answer is always
+# re-checked against the database before a request is refused, so a join made in
+# another process is honoured at once. A leave made elsewhere can take up to
+# MEMBERSHIP_CACHE_TTL seconds to be enforced here; in this process join and leave
+# invalidate the entry immediately. Lookups always go to the primary database,
+# never to a lagging read replica.
+
+class MembershipCache:
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._groups = {}  # user_id -> (expires_at, group ids)
+
+    def init_app(self, app):
+        self.ttl = app.config['MEMBERSHIP_CACHE_TTL']
+        with self._lock: self._groups.clear()
+
+    def load(self, user_id):
+        group_ids = frozenset(db.session.execute(db.select(group_members.c.group_id).where(group_members.c.user_id == user_id), bind_arguments={'bind': db.engine}).scalars())
+        with self._lock: self._groups[user_id] = (time.monotonic() + self.ttl, group_ids)
+        return group_ids
+
+    def groups_of(self, user_id):
+        with self._lock: entry = self._groups.get(user_id)
+        if entry is None or entry[0] < time.monotonic(): return self.load(user_id)
+        return entry[1]
+
+    def is_member(self, user_id, group_id):
+        return group_id in self.groups_of(user_id) or group_id in self.load(user_id)
+
+    def invalidate(self, user_id):
+        with self._lock: self._groups.pop(user_id, None)
+
+membership = MembershipCache()
+
+def member_required(view):
+    """Refuse with 403 unless the current user belongs to the route's ``group_id``."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not membership.is_member(int(get_jwt_identity()), kwargs['group_id']):
+            return jsonify({'message': 'You are not a member of this group'}), 403
+        return view(*args, **kwargs)
+    return wrapper
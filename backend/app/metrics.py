@@ -0,0 +1,138 @@
+import bisect
+import logging
+import threading
+import time
+from functools import partial
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from .cache import response_cache
+from .database import TimedQueuePool
+from .models import db
+
+logger = logging.getLogger(__name__)
+
+# Request-level instrumentation, switched on with METRICS_ENABLED. When it is off
+# no hooks or listeners are installed at all.
+#
+# Per endpoint it records latency, queries per request and time spent in the
+# database, logs slow requests and slow queries, and serves everything in the
+# Prometheus text format at /metrics. Streaming endpoints (events, export) are
+# timed until their headers are sent. For each connection pool it records how long
+# checkouts waited and how many timed out, and reports the pool's current usage.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+def _labels(names, values):
+    return ','.join(f'{n}="{v}"' for n, v in zip(names, values))
+
+class Histogram:
+    def __init__(self, name, help, labels, buckets):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [count per bucket..., count above the last bucket, sum, count]
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.setdefault(label_values, [0] * (len(self.buckets) + 3))
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-2] += value; series[-1] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock: series = {k: list(v) for k, v in self._series.items()}
+        for label_values, counts in sorted(series.items()):
+            labels = _labels(self.labels, label_values); cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count; lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {counts[-1]}')
+            lines.append(f'{self.name}_sum{{{labels}}} {counts[-2]}'); lines.append(f'{self.name}_count{{{labels}}} {counts[-1]}')
+        return lines
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, labels
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock: self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock: values = dict(self._values) or ({} if self.labels else {(): 0})
+        for label_values, value in sorted(values.items()):
+            lines.append(f'{self.name}{{{_labels(self.labels, label_values)}}} {value}' if self.labels else f'{self.name} {value}')
+        return lines
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.latency = Histogram('peerstudy_request_duration_seconds', 'Request latency by endpoint.', ('endpoint', 'method', 'status'), LATENCY_BUCKETS)
+        self.queries = Histogram('peerstudy_request_queries', 'SQL statements executed per request.', ('endpoint',), QUERY_BUCKETS)
+        self.db_time = Histogram('peerstudy_request_db_seconds', 'Time spent in SQL statements per request.', ('endpoint',), LATENCY_BUCKETS)
+        self.slow_requests = Counter('peerstudy_slow_requests_total', 'Requests slower than SLOW_REQUEST_MS.', ('endpoint',))
+        self.slow_queries = Counter('peerstudy_slow_queries_total', 'SQL statements slower than SLOW_QUERY_MS.')
+        self.pool_wait = Histogram('peerstudy_db_pool_checkout_seconds', 'Time spent waiting for a pooled database connection.', ('bind',), LATENCY_BUCKETS)
+        self.pool_timeouts = Counter('peerstudy_db_pool_timeouts_total', 'Checkouts that gave up after DATABASE_POOL_TIMEOUT.', ('bind',))
+
+    def init_app(self, app):
+        self.enabled = app.config['METRICS_ENABLED']
+        if not self.enabled: return
+        self.slow_request = app.config['SLOW_REQUEST_MS'] / 1000; self.slow_query = app.config['SLOW_QUERY_MS'] / 1000
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        with app.app_context():
+            for key, engine in db.engines.items():
+                event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+                if isinstance(engine.pool, TimedQueuePool): engine.pool.on_checkout = partial(self._pool_checkout, key or 'default')
+        app.add_url_rule('/metrics', 'metrics', self.render)
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter(); g.metrics_queries = 0; g.metrics_db_time = 0.0
+
+    def _after_request(self, response):
+        if 'metrics_started' not in g: return response
+        elapsed = time.perf_counter() - g.metrics_started
+        endpoint = request.endpoint or 'unmatched'
+        self.latency.observe(elapsed, endpoint, request.method, str(response.status_code))
+        self.queries.observe(g.metrics_queries, endpoint); self.db_time.observe(g.metrics_db_time, endpoint)
+        if elapsed >= self.slow_request:
+            self.slow_requests.inc(endpoint)
+            logger.warning("Slow request %s %s: %.0fms, %d queries, %.0fms in the database",
+                           request.method, request.full_path, elapsed * 1000, g.metrics_queries, g.metrics_db_time * 1000)
+        return response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['metrics_started'].pop()
+        if has_request_context() and 'metrics_queries' in g:
+            g.metrics_queries += 1; g.metrics_db_time += elapsed
+        if elapsed >= self.slow_query:
+            self.slow_queries.inc()
+            logger.warning("Slow query: %.0fms\n%s\nparameters: %r", elapsed * 1000, statement, parameters)
+
+    def _pool_checkout(self, bind, elapsed, timed_out):
+        self.pool_wait.observe(elapsed, bind)
+        if timed_out:
+            self.pool_timeouts.inc(bind)
+            logger.warning("Timed out after %.0fms waiting for a %s database connection", elapsed * 1000, bind)
+
+    def render(self):
+        lines = []
+        for metric in (self.latency, self.queries, self.db_time, self.slow_requests, self.slow_queries, self.pool_wait, self.pool_timeouts): lines += metric.render()
+        pools = {key or 'default': engine.pool for key, engine in db.engines.items() if isinstance(engine.pool, TimedQueuePool)}
+        for name, help, value in (('size', 'Connections kept open by the pool.', lambda p: p.size()),
+                                  ('checked_out', 'Connections currently in use.', lambda p: p.checkedout()),
+                                  ('saturation', 'Connections in use as a fraction of pool_size + max_overflow.', lambda p: p.checkedout() / p.capacity if p.capacity else 0)):
+            lines += [f'# HELP peerstudy_db_pool_{name} {help}', f'# TYPE peerstudy_db_pool_{name} gauge']
+            lines += [f'peerstudy_db_pool_{name}{{bind="{bind}"}} {value(pool)}' for bind, pool in sorted(pools.items())]
+        for name, value in response_cache.stats().items():
+            kind = 'gauge' if name == 'entries' else 'counter'; metric = f'peerstudy_response_cache_{name}' + ('_total' if kind == 'counter' else '')
+            lines += [f'# TYPE {metric} {kind}', f'{metric} {value}']
+        return current_app.response_class('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+metrics = Metrics()
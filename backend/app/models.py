@@ -1,14 +1,25 @@
 
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
+from sqlalchemy import func, insert, literal_column
 from datetime import datetime
+from .database import RoutingSession
+from .hashing import hashing_pool
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 bcrypt = Bcrypt()
 
+def search_document(*columns):
+    """The tsvector behind the GIN search indexes; queries must use this exact expression to hit them."""
+    document = func.coalesce(columns[0], literal_column("''"))
+    for column in columns[1:]: document = document.op('||')(literal_column("' '")).op('||')(func.coalesce(column, literal_column("''")))
+    return func.to_tsvector(literal_column("'english'"), document)
+
 group_members = db.Table('group_members',
     db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
-    db.Column('group_id', db.Integer, db.ForeignKey('group.id'), primary_key=True)
+    db.Column('group_id', db.Integer, db.ForeignKey('group.id'), primary_key=True),
+    db.Index('ix_group_members_group_id', 'group_id')
 )
 
 class User(db.Model):
@@ -16,11 +27,15 @@ class User(db.Model):
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(128))
+    groups_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = hashing_pool.run(bcrypt.generate_password_hash, password, current_app.config['BCRYPT_LOG_ROUNDS']).decode('utf-8')
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return hashing_pool.run(bcrypt.check_password_hash, self.password_hash, password)
+    def password_needs_rehash(self):
+        # bcrypt hashes look like $2b$<cost>$<salt+digest>
+        return int(self.password_hash.split('$')[2]) != current_app.config['BCRYPT_LOG_ROUNDS']
 
 class Group(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -29,6 +44,12 @@ class Group(db.Model):
     description = db.Column(db.Text)
     join_code = db.Column(db.String(8), unique=True, nullable=False)
     creator_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    # Bumped in the same transaction as every write to the matching collection;
+    # they back the ETags of the group's read endpoints.
+    notes_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    meetups_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    chat_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    members_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     creator = db.relationship('User', backref='created_groups')
     members = db.relationship('User', secondary=group_members, backref='joined_groups')
@@ -46,6 +67,11 @@ class Note(db.Model):
     group_id = db.Column(db.Integer, db.ForeignKey('group.id'), nullable=False)
     uploader = db.relationship('User', backref='notes')
 
+    __table_args__ = (
+        db.Index('ix_note_group_id_created_at', group_id, created_at.desc(), id.desc()),
+        db.Index('ix_note_search', search_document(title, content), postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
+
 class Meetup(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     topic = db.Column(db.String(200), nullable=False)
@@ -56,10 +82,55 @@ class Meetup(db.Model):
     creator_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     creator = db.relationship('User', backref='created_meetups')
 
+    __table_args__ = (
+        db.Index('ix_meetup_group_id_scheduled_time', group_id, scheduled_time, id),
+        db.Index('ix_meetup_search', search_document(topic, description), postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
+
 class ChatMessage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     text = db.Column(db.Text, nullable=False)
     timestamp = db.Column(db.DateTime, index=True, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     group_id = db.Column(db.Integer, db.ForeignKey('group.id'), nullable=False)
-    author = db.relationship('User', backref='chat_messages')
\ No newline at end of file
+    author = db.relationship('User', backref='chat_messages')
+
+    __table_args__ = (db.Index('ix_chat_message_group_id_timestamp', group_id, timestamp, id),)
+
+class ChangeLogEntry(db.Model):
+    """Append-only record of writes to a group's content, read by the sync endpoint.
+
+    ``group_id`` is deliberately not a foreign key so that a group's deletion
+    tombstone outlives the group itself. A tombstone's ``user_id`` is the last
+    member, whose leave deleted the group; only they may read it.
+    """
+    __tablename__ = 'change_log'
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    group_id = db.Column(db.Integer, nullable=False)
+    collection = db.Column(db.String(16), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(8), nullable=False, default='upsert')
+    user_id = db.Column(db.Integer)
+
+    __table_args__ = (db.Index('ix_change_log_group_id_id', group_id, id), {'sqlite_autoincrement': True})
+
+def bump_group_versions(group_id, *collections):
+    Group.query.filter_by(id=group_id).update({getattr(Group, f'{c}_version'): getattr(Group, f'{c}_version') + 1 for c in collections}, synchronize_session=False)
+
+def bump_user_groups_version(user_id):
+    User.query.filter_by(id=user_id).update({User.groups_version: User.groups_version + 1}, synchronize_session=False)
+
+def record_change(group_id, collection, entity_id, op='upsert'):
+    # The version bump takes the group row lock before the log id is allocated,
+    # so within one group log ids become visible in increasing order.
+    bump_group_versions(group_id, collection)
+    db.session.add(ChangeLogEntry(group_id=group_id, collection=collection, entity_id=entity_id, op=op))
+
+def record_changes(group_id, collection, entity_ids, op='upsert'):
+    """record_change for many rows of one collection: one version bump and one multi-row insert."""
+    bump_group_versions(group_id, collection)
+    if entity_ids: db.session.execute(insert(ChangeLogEntry), [{'group_id': group_id, 'collection': collection, 'entity_id': i, 'op': op} for i in entity_ids])
+
+def record_group_deleted(group_id, user_id):
+    ChangeLogEntry.query.filter_by(group_id=group_id).delete(synchronize_session=False)
+    db.session.add(ChangeLogEntry(group_id=group_id, collection='group', entity_id=group_id, op='delete', user_id=user_id))
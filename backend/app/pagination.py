@@ -0,0 +1,73 @@
+import base64
+import binascii
+from datetime import datetime
+from flask import request, current_app
+from sqlalchemy import tuple_
+
+# Keyset pagination over (timestamp, id). Cursors are opaque to clients: a base64
+# encoding of the sort key of the first/last row of the page they came from.
+
+def encode_cursor(value, row_id):
+    return base64.urlsafe_b64encode(f"{value.isoformat()}|{row_id}".encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        value, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(value), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+def page_size(args=None):
+    args = request.args if args is None else args
+    default, maximum = current_app.config['API_PAGE_SIZE'], current_app.config['API_MAX_PAGE_SIZE']
+    try: limit = int(args.get('limit', default))
+    except ValueError: limit = default
+    return max(1, min(limit, maximum))
+
+def paginate(query, sort_col, id_col, serialize, ascending=False, latest=True, args=None, start=None):
+    """Return one page of ``query`` as ``{'items', 'before', 'after'}``, or None for a bad cursor.
+
+    ``before``/``after`` request arguments select rows strictly older/newer than the
+    cursor; without either, the latest page is returned (or the earliest one when
+    ``latest`` is False). Items are ordered by ``ascending`` and the response cursors
+    are only set when more rows exist in that direction. ``args`` defaults to the
+    request's query arguments.
+
+    With ``start`` and no cursor, the page begins at the first row sorting at or after
+    ``start`` (e.g. upcoming meetups) and ``before`` leads to the rows ahead of it.
+    """
+    args = request.args if args is None else args
+    limit = page_size(args)
+    before, after = args.get('before'), args.get('after')
+    key = tuple_(sort_col, id_col)
+    earlier = None
+    if start is not None and not before and not after:
+        earlier = query.filter(sort_col < start); query = query.filter(sort_col >= start)
+    if before:
+        cursor = decode_cursor(before)
+        if cursor is None: return None
+        query = query.filter(key < tuple_(*cursor))
+    if after:
+        cursor = decode_cursor(after)
+        if cursor is None: return None
+        query = query.filter(key > tuple_(*cursor))
+
+    descending = bool(before) or (not after and latest)
+    order = (sort_col.desc(), id_col.desc()) if descending else (sort_col.asc(), id_col.asc())
+    rows = query.order_by(*order).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    # Rows before ``start`` are reached with a cursor just ahead of it.
+    start_cursor = encode_cursor(start, 0) if earlier is not None and query.session.query(earlier.exists()).scalar() else None
+    if not rows: return {'items': [], 'before': start_cursor, 'after': None}
+
+    has_older = has_more if descending else bool(after)
+    has_newer = bool(before) if descending else has_more
+    oldest, newest = (rows[-1], rows[0]) if descending else (rows[0], rows[-1])
+    if descending == ascending: rows.reverse()
+    return {
+        'items': [serialize(r) for r in rows],
+        'before': start_cursor if earlier is not None else encode_cursor(getattr(oldest, sort_col.key), oldest.id) if has_older else None,
+        'after': encode_cursor(getattr(newest, sort_col.key), newest.id) if has_newer else None,
+    }
@@ -1,17 +1,47 @@
-from flask import Blueprint, request, jsonify
-from .models import db, User, Group, Note, Meetup, ChatMessage
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from .models import db, User, Group, Note, Meetup, ChatMessage, group_members, bump_group_versions, bump_user_groups_version, record_change, record_group_deleted
+from .conditional import conditional, group_collection_version, user_groups_version
+from .cache import response_cache
+from .events import broker, sse_stream
+from .export import export_lines
+from .imports import import_items, read_items
+from .membership import member_required, membership
+from .hashing import HashingPoolBusy
+from .pagination import page_size, paginate
+from .search import SEARCHABLE, search_collection, search_terms
+from .sync import SYNCED, group_changes, group_deleted, latest_token
+from .serializers import note_to_dict, meetup_to_dict, chat_message_to_dict, notes_query, meetups_query, chat_messages_query, groups_for_user, group_details, upcoming_start
 from datetime import datetime
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
 import secrets
 import string
 
 api_bp = Blueprint('api', __name__)
 
+@api_bp.errorhandler(HashingPoolBusy)
+def hashing_pool_busy(e):
+    return jsonify({'message': 'Server is busy, please retry shortly'}), 503, {'Retry-After': str(e.retry_after)}
+
+JOIN_CODE_ATTEMPTS = 5
+
 def generate_join_code(length=6):
     alphabet = string.ascii_uppercase + string.digits
-    while True:
-        code = ''.join(secrets.choice(alphabet) for _ in range(length))
-        if not Group.query.filter_by(join_code=code).first(): return code
+    return ''.join(secrets.choice(alphabet) for _ in range(length))
+
+def add_with_join_code(group):
+    """Insert ``group`` under a random join code, drawing a new one if the unique constraint rejects it.
+
+    Each attempt is a savepoint, so a collision, including one with a concurrent
+    create_group, only costs a retry, and nothing is read beforehand.
+    """
+    for attempt in range(JOIN_CODE_ATTEMPTS):
+        group.join_code = generate_join_code()
+        try:
+            with db.session.begin_nested(): db.session.add(group)
+            return
+        except IntegrityError as e:
+            if 'join_code' not in str(e.orig) or attempt == JOIN_CODE_ATTEMPTS - 1: raise
 
 @api_bp.route('/register', methods=['POST'])
 def register():
@@ -26,65 +56,107 @@ def login():
     data = request.get_json(force=True)
     user = User.query.filter_by(username=data['username']).first()
     if user and user.check_password(data['password']):
+        if user.password_needs_rehash(): user.set_password(data['password']); db.session.commit()
         return jsonify(access_token=create_access_token(identity=str(user.id)), user_id=user.id), 200
     return jsonify({'message': 'Invalid credentials'}), 401
 
 @api_bp.route('/groups', methods=['GET'])
 @jwt_required()
+@conditional(user_groups_version)
+@response_cache.cached(per_user=True)
 def get_groups():
-    user = User.query.get(get_jwt_identity())
-    return jsonify([{'id': g.id, 'name': g.name, 'course_code': g.course_code, 'member_count': len(g.members), 'join_code': g.join_code} for g in user.joined_groups])
+    return jsonify(groups_for_user(get_jwt_identity()))
 
 @api_bp.route('/groups/<int:group_id>', methods=['GET'])
 @jwt_required()
+@member_required
+@conditional(group_collection_version('members'))
+@response_cache.cached('members')
 def get_group_details(group_id):
     group = Group.query.get_or_404(group_id)
     return jsonify({'id': group.id, 'name': group.name})
 
 
+@api_bp.route('/groups/<int:group_id>/bootstrap', methods=['GET'])
+@jwt_required()
+@member_required
+@conditional(group_collection_version('notes', 'meetups', 'chat', 'members', daily=True))
+@response_cache.cached('notes', 'meetups', 'chat', 'members')
+def bootstrap_group(group_id):
+    group = group_details(group_id)
+    if group is None: return jsonify({'message': 'Group not found'}), 404
+    # Read the sync token first: rows written meanwhile are re-sent by /sync, never missed.
+    token = latest_token(group_id)
+    args = {'limit': request.args.get('limit', current_app.config['API_PAGE_SIZE'])}
+    return jsonify({
+        'group': group,
+        'token': str(token),
+        'notes': paginate(notes_query(group_id), Note.created_at, Note.id, note_to_dict, args=args),
+        'meetups': paginate(meetups_query(group_id), Meetup.scheduled_time, Meetup.id, meetup_to_dict, ascending=True, latest=False, args=args, start=upcoming_start()),
+        'chat': paginate(chat_messages_query(group_id), ChatMessage.timestamp, ChatMessage.id, chat_message_to_dict, ascending=True, args=args),
+    })
+
+
 @api_bp.route('/groups', methods=['POST'])
 @jwt_required()
 def create_group():
     user_id = get_jwt_identity()
     data = request.get_json(force=True)
-    new_group = Group(name=data.get('name'), course_code=data.get('course_code', ''), description=data.get('description', ''), join_code=generate_join_code(), creator_id=user_id)
-    new_group.members.append(User.query.get(user_id))
-    db.session.add(new_group); db.session.commit()
+    new_group = Group(name=data.get('name'), course_code=data.get('course_code', ''), description=data.get('description', ''), creator_id=user_id)
+    add_with_join_code(new_group)
+    db.session.execute(group_members.insert().values(user_id=int(user_id), group_id=new_group.id))
+    bump_user_groups_version(user_id); db.session.commit()
+    response_cache.invalidate_user(user_id); membership.invalidate(int(user_id))
     return jsonify({'message': 'Group created', 'group_id': new_group.id}), 201
 
 @api_bp.route('/groups/join', methods=['POST'])
 @jwt_required()
 def join_group_by_code():
-    user = User.query.get(get_jwt_identity())
+    user_id = int(get_jwt_identity())
     data = request.get_json(force=True)
     group = Group.query.filter_by(join_code=data.get('join_code', '').upper()).first()
     if not group: return jsonify({'message': 'Invalid join code'}), 404
-    if user in group.members: return jsonify({'message': 'You are already a member'}), 409
-    group.members.append(user); db.session.commit()
+    if group.id in membership.load(user_id): return jsonify({'message': 'You are already a member'}), 409
+    db.session.execute(group_members.insert().values(user_id=user_id, group_id=group.id))
+    bump_group_versions(group.id, 'members'); bump_user_groups_version(user_id); db.session.commit()
+    response_cache.invalidate_group(group.id, 'members'); response_cache.invalidate_user(user_id); membership.invalidate(user_id)
     return jsonify({"message": f"Successfully joined group: {group.name}"}), 200
 
 @api_bp.route('/groups/<int:group_id>/notes', methods=['GET'])
 @jwt_required()
+@member_required
+@conditional(group_collection_version('notes'))
+@response_cache.cached('notes')
 def get_notes_for_group(group_id):
-    notes = Note.query.filter_by(group_id=group_id).order_by(Note.created_at.desc()).all()
-    return jsonify([{'id': n.id, 'title': n.title, 'content': n.content, 'uploader': n.uploader.username, 'created_at': n.created_at.isoformat()} for n in notes])
+    page = paginate(notes_query(group_id), Note.created_at, Note.id, note_to_dict)
+    if page is None: return jsonify({'message': 'Invalid cursor'}), 400
+    return jsonify(page)
 
 @api_bp.route('/groups/<int:group_id>/notes', methods=['POST'])
 @jwt_required()
+@member_required
 def add_note_to_group(group_id):
     data = request.get_json(force=True)
     new_note = Note(title=data['title'], content=data['content'], uploader_id=get_jwt_identity(), group_id=group_id)
-    db.session.add(new_note); db.session.commit()
-    return jsonify({'id': new_note.id, 'title': new_note.title, 'content': new_note.content, 'uploader': new_note.uploader.username, 'created_at': new_note.created_at.isoformat()}), 201
+    db.session.add(new_note); db.session.flush(); record_change(group_id, 'notes', new_note.id)
+    note = note_to_dict(new_note)
+    broker.publish(group_id, 'note', note); db.session.commit()
+    response_cache.invalidate_group(group_id, 'notes')
+    return jsonify(note), 201
 
 @api_bp.route('/groups/<int:group_id>/meetups', methods=['GET'])
 @jwt_required()
+@member_required
+@conditional(group_collection_version('meetups', daily=True))
+@response_cache.cached('meetups')
 def get_meetups(group_id):
-    meetups = Meetup.query.filter_by(group_id=group_id).order_by(Meetup.scheduled_time.asc()).all()
-    return jsonify([{'id': m.id, 'topic': m.topic, 'description': m.description, 'link': m.meetup_link, 'time': m.scheduled_time.isoformat(), 'creator': m.creator.username} for m in meetups])
+    page = paginate(meetups_query(group_id), Meetup.scheduled_time, Meetup.id, meetup_to_dict, ascending=True, latest=False, start=upcoming_start())
+    if page is None: return jsonify({'message': 'Invalid cursor'}), 400
+    return jsonify(page)
 
 @api_bp.route('/groups/<int:group_id>/meetups', methods=['POST'])
 @jwt_required()
+@member_required
 def schedule_meetup(group_id):
     data = request.get_json(force=True)
     new_meetup = Meetup(
@@ -95,17 +167,24 @@ def schedule_meetup(group_id):
         meetup_link=data.get('link', ''),
         scheduled_time=datetime.fromisoformat(data['time'])
     )
-    db.session.add(new_meetup); db.session.commit()
+    db.session.add(new_meetup); db.session.flush(); record_change(group_id, 'meetups', new_meetup.id)
+    broker.publish(group_id, 'meetup', meetup_to_dict(new_meetup)); db.session.commit()
+    response_cache.invalidate_group(group_id, 'meetups')
     return jsonify({'message': 'Meetup scheduled!'}), 201
 
 @api_bp.route('/groups/<int:group_id>/chat', methods=['GET'])
 @jwt_required()
+@member_required
+@conditional(group_collection_version('chat'))
+@response_cache.cached('chat')
 def get_chat_messages(group_id):
-    messages = ChatMessage.query.filter_by(group_id=group_id).order_by(ChatMessage.timestamp.asc()).limit(50).all()
-    return jsonify([{'id': msg.id, 'text': msg.text, 'timestamp': msg.timestamp.isoformat(), 'author': msg.author.username} for msg in messages])
+    page = paginate(chat_messages_query(group_id), ChatMessage.timestamp, ChatMessage.id, chat_message_to_dict, ascending=True)
+    if page is None: return jsonify({'message': 'Invalid cursor'}), 400
+    return jsonify(page)
 
 @api_bp.route('/groups/<int:group_id>/chat', methods=['POST'])
 @jwt_required()
+@member_required
 def post_chat_message(group_id):
     data = request.get_json(force=True)
     new_msg = ChatMessage(
@@ -113,30 +192,93 @@ def post_chat_message(group_id):
         user_id=get_jwt_identity(),
         text=data['text']
     )
-    db.session.add(new_msg); db.session.commit()
-    return jsonify({'id': new_msg.id, 'text': new_msg.text, 'timestamp': new_msg.timestamp.isoformat(), 'author': new_msg.author.username}), 201
+    db.session.add(new_msg); db.session.flush(); record_change(group_id, 'chat', new_msg.id)
+    message = chat_message_to_dict(new_msg)
+    broker.publish(group_id, 'chat_message', message); db.session.commit()
+    response_cache.invalidate_group(group_id, 'chat')
+    return jsonify(message), 201
+
+@api_bp.route('/groups/<int:group_id>/sync', methods=['GET'])
+@jwt_required()
+def sync_group(group_id):
+    since = request.args.get('since')
+    if since is not None and not since.isdigit(): return jsonify({'message': 'Invalid sync token'}), 400
+    # A group is deleted when its last member leaves, so nobody is a member any more;
+    # that member's other sessions still get the tombstone so they can drop the group.
+    user_id = int(get_jwt_identity())
+    if not membership.is_member(user_id, group_id) and not group_deleted(group_id, user_id):
+        return jsonify({'message': 'You are not a member of this group'}), 403
+    return jsonify(group_changes(group_id, int(since) if since is not None else None, current_app.config['SYNC_MAX_CHANGES']))
+
+@api_bp.route('/groups/<int:group_id>/search', methods=['GET'])
+@jwt_required()
+@member_required
+@conditional(group_collection_version('notes', 'meetups'))
+def search_group_content(group_id):
+    terms = search_terms(request.args.get('q', ''))
+    if not terms: return jsonify({'message': 'A search query is required'}), 400
+    collections = [request.args['type']] if request.args.get('type') else list(SEARCHABLE)
+    if any(c not in SEARCHABLE for c in collections): return jsonify({'message': 'Unknown search type'}), 400
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    return jsonify({c: search_collection(c, group_id, terms, page_size(), offset) for c in collections})
+
+@api_bp.route('/groups/<int:group_id>/export', methods=['GET'])
+@jwt_required()
+@member_required
+def export_group(group_id):
+    group = group_details(group_id)
+    if group is None: return jsonify({'message': 'Group not found'}), 404
+    collections = request.args['type'].split(',') if request.args.get('type') else list(SYNCED)
+    if any(c not in SYNCED for c in collections): return jsonify({'message': 'Unknown export type'}), 400
+    lines = export_lines(group_id, group, collections, current_app.config['EXPORT_BATCH_SIZE'])
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson',
+                    headers={'Content-Disposition': f'attachment; filename=group-{group_id}.ndjson', 'X-Accel-Buffering': 'no'})
+
+@api_bp.route('/groups/<int:group_id>/import', methods=['POST'])
+@jwt_required()
+@member_required
+def import_group_content(group_id):
+    if db.session.get(Group, group_id) is None: return jsonify({'message': 'Group not found'}), 404
+    inserted, errors = import_items(group_id, int(get_jwt_identity()), read_items(request), current_app.config['IMPORT_MAX_ITEMS'])
+    if errors:
+        db.session.rollback()
+        return jsonify({'message': 'Import rejected, nothing was saved', 'errors': errors[:100], 'error_count': len(errors)}), 400
+    # One resync instead of an event per row; clients catch up through /sync.
+    if inserted: broker.publish(group_id, 'resync', {'imported': {c: len(ids) for c, ids in inserted.items()}})
+    db.session.commit()
+    response_cache.invalidate_group(group_id, *inserted)
+    return jsonify({'message': 'Import complete', 'imported': {c: len(ids) for c, ids in inserted.items()}, 'ids': inserted}), 201
+
+@api_bp.route('/groups/<int:group_id>/events', methods=['GET'])
+@jwt_required()
+@member_required
+def stream_group_events(group_id):
+    stream = sse_stream(group_id, current_app.config['EVENT_STREAM_KEEPALIVE'])
+    return Response(stream, mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 @api_bp.route('/groups/<int:group_id>/leave', methods=['POST'])
 @jwt_required()
 def leave_group(group_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user_id = int(get_jwt_identity())
     group = Group.query.get(group_id)
 
     if not group:
         return jsonify({'message': 'Group not found'}), 404
 
-    if user not in group.members:
+    if group_id not in membership.load(user_id):
         return jsonify({'message': 'You are not a member of this group'}), 400
 
-    group.members.remove(user)
+    db.session.execute(group_members.delete().where(group_members.c.user_id == user_id, group_members.c.group_id == group_id))
+    bump_group_versions(group.id, 'members'); bump_user_groups_version(user_id)
     
-    if not group.members:
-        db.session.delete(group)
+    stale = ['members']
+    if not db.session.query(group_members.c.user_id).filter(group_members.c.group_id == group_id).first():
+        db.session.delete(group); record_group_deleted(group.id, user_id); stale += ['notes', 'meetups', 'chat']
         message = f"You have left the group '{group.name}', and it has been deleted as you were the last member."
     else:
         message = f"You have successfully left the group '{group.name}'."
 
     db.session.commit()
+    response_cache.invalidate_group(group_id, *stale); response_cache.invalidate_user(user_id); membership.invalidate(user_id)
     return jsonify({'message': message}), 200
\ No newline at end of file
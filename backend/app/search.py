@@ -0,0 +1,53 @@
+import re
+from sqlalchemy import DDL, Float, Integer, event, func, text
+from .models import db, Note, Meetup, search_document
+from .serializers import note_to_dict, meetup_to_dict, notes_query, meetups_query
+
+# Full-text search over a group's notes and meetups.
+#
+# On Postgres the documents are GIN-indexed expressions (see the indexes in
+# models.py) matched with to_tsquery and ranked with ts_rank. On SQLite, used for
+# local and test setups, external-content FTS5 tables kept in sync by triggers
+# are matched instead and ranked with bm25.
+
+SEARCHABLE = {
+    'notes': (Note, notes_query, note_to_dict, 'note_fts', ('title', 'content')),
+    'meetups': (Meetup, meetups_query, meetup_to_dict, 'meetup_fts', ('topic', 'description')),
+}
+
+def _fts5_ddl(table, fts_table, columns):
+    cols = ', '.join(columns)
+    new_cols = ', '.join(f'new.{c}' for c in columns)
+    old_cols = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {fts_table} USING fts5({cols}, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER {fts_table}_ai AFTER INSERT ON {table} BEGIN INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+        f"CREATE TRIGGER {fts_table}_ad AFTER DELETE ON {table} BEGIN INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); END",
+        f"CREATE TRIGGER {fts_table}_au AFTER UPDATE ON {table} BEGIN INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+    ]
+
+for _model, _, _, _fts_table, _columns in SEARCHABLE.values():
+    for _statement in _fts5_ddl(_model.__tablename__, _fts_table, _columns):
+        event.listen(_model.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+    event.listen(_model.__table__, 'after_drop', DDL(f"DROP TABLE IF EXISTS {_fts_table}").execute_if(dialect='sqlite'))
+
+def search_terms(q):
+    return re.findall(r'\w+', q.lower())
+
+def search_collection(collection, group_id, terms, limit, offset):
+    """One page of ``collection`` rows in ``group_id`` matching every term as a prefix."""
+    model, base_query, serialize, fts_table, columns = SEARCHABLE[collection]
+    query = base_query(group_id)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        tsquery = func.to_tsquery('english', ' & '.join(f'{t}:*' for t in terms))
+        document = search_document(*(getattr(model, c) for c in columns))
+        rank = func.ts_rank(document, tsquery)
+        query = query.filter(document.op('@@')(tsquery)).order_by(rank.desc(), model.id.desc())
+    else:
+        matches = (text(f"SELECT rowid AS id, bm25({fts_table}) AS rank FROM {fts_table} WHERE {fts_table} MATCH :match")
+                   .bindparams(match=' '.join(f'"{t}"*' for t in terms))
+                   .columns(id=Integer, rank=Float)
+                   .subquery())
+        query = query.join(matches, matches.c.id == model.id).order_by(matches.c.rank.asc(), model.id.desc())
+    rows = query.limit(limit + 1).offset(offset).all()
+    return {'items': [serialize(r) for r in rows[:limit]], 'next_offset': offset + limit if len(rows) > limit else None}
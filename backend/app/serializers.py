@@ -0,0 +1,51 @@
+from datetime import datetime, time
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from .models import db, Group, Note, Meetup, ChatMessage, group_members
+
+# Every list endpoint goes through these helpers so author names are loaded in the
+# same SELECT as the rows (joinedload) instead of one lazy load per row.
+
+def note_to_dict(n):
+    return {'id': n.id, 'title': n.title, 'content': n.content, 'uploader': n.uploader.username, 'created_at': n.created_at.isoformat()}
+
+def meetup_to_dict(m):
+    return {'id': m.id, 'topic': m.topic, 'description': m.description, 'link': m.meetup_link, 'time': m.scheduled_time.isoformat(), 'creator': m.creator.username}
+
+def chat_message_to_dict(msg):
+    return {'id': msg.id, 'text': msg.text, 'timestamp': msg.timestamp.isoformat(), 'author': msg.author.username}
+
+def group_to_dict(g, member_count):
+    return {'id': g.id, 'name': g.name, 'course_code': g.course_code, 'member_count': member_count, 'join_code': g.join_code}
+
+def notes_query(group_id):
+    return Note.query.options(joinedload(Note.uploader)).filter_by(group_id=group_id)
+
+def meetups_query(group_id):
+    return Meetup.query.options(joinedload(Meetup.creator)).filter_by(group_id=group_id)
+
+def upcoming_start():
+    """Where the default meetups page starts: today (UTC), so it moves once a day."""
+    return datetime.combine(datetime.utcnow().date(), time.min)
+
+def chat_messages_query(group_id):
+    return ChatMessage.query.options(joinedload(ChatMessage.author)).filter_by(group_id=group_id)
+
+def member_count_column():
+    """Member count of the enclosing query's Group, one index range scan per group."""
+    members = group_members.alias()
+    return db.session.query(func.count()).select_from(members).filter(members.c.group_id == Group.id).correlate(Group).scalar_subquery()
+
+def groups_for_user(user_id):
+    """Groups joined by ``user_id`` with their member counts, in a single query."""
+    rows = (db.session.query(Group, member_count_column())
+            .join(group_members, group_members.c.group_id == Group.id)
+            .filter(group_members.c.user_id == int(user_id))
+            .order_by(Group.id)
+            .all())
+    return [group_to_dict(g, count) for g, count in rows]
+
+def group_details(group_id):
+    """Metadata and member count of one group in a single query, or None."""
+    row = db.session.query(Group, member_count_column()).filter(Group.id == group_id).first()
+    return row and {**group_to_dict(*row), 'description': row[0].description}
@@ -0,0 +1,45 @@
+from sqlalchemy import func
+from .models import db, ChangeLogEntry, Group, Note, Meetup, ChatMessage
+from .serializers import note_to_dict, meetup_to_dict, chat_message_to_dict, notes_query, meetups_query, chat_messages_query
+
+# Delta sync: a client holding token N receives every row of the group written
+# after change-log entry N, plus tombstones, and the token to resume from.
+
+SYNCED = {
+    'notes': (Note, notes_query, note_to_dict),
+    'meetups': (Meetup, meetups_query, meetup_to_dict),
+    'chat': (ChatMessage, chat_messages_query, chat_message_to_dict),
+}
+
+def latest_token(group_id):
+    return db.session.query(func.coalesce(func.max(ChangeLogEntry.id), 0)).filter(ChangeLogEntry.group_id == group_id).scalar()
+
+def group_deleted(group_id, user_id):
+    """True if ``group_id`` is gone and its deletion tombstone, left by ``user_id``, is still in the change log."""
+    return db.session.get(Group, group_id) is None and db.session.query(ChangeLogEntry.id).filter_by(group_id=group_id, collection='group', op='delete', user_id=user_id).first() is not None
+
+def group_changes(group_id, since, max_changes):
+    """Changes to ``group_id`` after token ``since``.
+
+    ``reset`` is set, with no rows, when the client has no token yet or is more than
+    ``max_changes`` behind; it should then reload the group and sync from ``token``.
+    """
+    result = {'token': str(since), 'reset': False, 'deleted': [], **{c: [] for c in SYNCED}}
+    if since is None:
+        return {**result, 'token': str(latest_token(group_id)), 'reset': True}
+    entries = (ChangeLogEntry.query.filter(ChangeLogEntry.group_id == group_id, ChangeLogEntry.id > since)
+               .order_by(ChangeLogEntry.id).limit(max_changes + 1).all())
+    if len(entries) > max_changes:
+        return {**result, 'token': str(latest_token(group_id)), 'reset': True}
+    if not entries: return result
+
+    changed = {c: set() for c in SYNCED}
+    for entry in entries:
+        if entry.op == 'delete': result['deleted'].append({'type': entry.collection, 'id': entry.entity_id})
+        else: changed[entry.collection].add(entry.entity_id)
+    for collection, ids in changed.items():
+        if not ids: continue
+        model, query, serialize = SYNCED[collection]
+        result[collection] = [serialize(row) for row in query(group_id).filter(model.id.in_(ids)).order_by(model.id)]
+    result['token'] = str(entries[-1].id)
+    return result
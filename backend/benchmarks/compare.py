@@ -0,0 +1,26 @@
+"""Compare two benchmark result files written by ``benchmarks.run --json``.
+
+    cd backend && python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+
+METRICS = (('p50_ms', 'p50'), ('p95_ms', 'p95'), ('p99_ms', 'p99'), ('throughput_rps', 'req/s'), ('queries_per_request', 'queries'))
+
+def change(before, after):
+    return f"{(after - before) / before * 100:+6.1f}%" if before else '    n/a'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('before'); parser.add_argument('after')
+    args = parser.parse_args()
+    with open(args.before) as f: before = json.load(f)['results']
+    with open(args.after) as f: after = json.load(f)['results']
+    for endpoint in [e for e in before if e in after]:
+        # queries_per_request is None for runs against --url.
+        cells = [f"{label} {before[endpoint][key]:.2f} -> {after[endpoint][key]:.2f} ({change(before[endpoint][key], after[endpoint][key])})"
+                 for key, label in METRICS if before[endpoint].get(key) is not None and after[endpoint].get(key) is not None]
+        print(f"{endpoint:>10}: " + '  '.join(cells))
+
+if __name__ == '__main__':
+    main()
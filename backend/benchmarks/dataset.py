@@ -0,0 +1,53 @@
+"""Deterministic synthetic PeerStudy data for benchmarks."""
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.models import db, bcrypt, User, Group, Note, Meetup, ChatMessage, ChangeLogEntry, group_members
+
+WORDS = ('algebra', 'calculus', 'derivative', 'integral', 'matrix', 'vector', 'proof', 'theorem', 'lemma', 'graph', 'network',
+         'protocol', 'compiler', 'parser', 'kernel', 'thread', 'memory', 'cache', 'entropy', 'quantum', 'enzyme', 'protein',
+         'essay', 'history', 'economics', 'market', 'chapter', 'lecture', 'review', 'exam', 'homework', 'summary', 'notes')
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+def seed(app, users=50, groups=20, members=10, notes=200, meetups=20, messages=1000, seed=0, batch=5000):
+    """Recreate the schema and fill it; returns ``{group_id: [member user ids]}``.
+
+    Every row gets its change_log entry, as if it had been written through the API.
+    """
+    rng = random.Random(seed); start = datetime(2024, 1, 1)
+    with app.app_context():
+        db.drop_all(); db.create_all()
+        password_hash = bcrypt.generate_password_hash('benchmark', 4).decode()
+        user_ids = sorted(db.session.scalars(insert(User).returning(User.id), [
+            {'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': password_hash} for i in range(users)]))
+        group_ids = sorted(db.session.scalars(insert(Group).returning(Group.id), [
+            {'name': f'{sentence(rng, 2).title()} {i}', 'course_code': f'C{i:04d}', 'description': sentence(rng, 12),
+             'join_code': f'B{i:05d}', 'creator_id': rng.choice(user_ids)} for i in range(groups)]))
+        membership = {g: rng.sample(user_ids, min(members, len(user_ids))) for g in group_ids}
+        db.session.execute(insert(group_members), [{'group_id': g, 'user_id': u} for g, us in membership.items() for u in us])
+
+        def rows(count, make):
+            for g, us in membership.items():
+                for i in range(count): yield make(g, us, i)
+
+        def insert_rows(model, collection, pending):
+            inserted = db.session.execute(insert(model).returning(model.id, model.group_id), pending).all()
+            db.session.execute(insert(ChangeLogEntry), [{'group_id': g, 'collection': collection, 'entity_id': i, 'op': 'upsert'} for i, g in inserted])
+
+        def insert_batched(model, collection, generated):
+            pending = []
+            for row in generated:
+                pending.append(row)
+                if len(pending) >= batch: insert_rows(model, collection, pending); pending = []
+            if pending: insert_rows(model, collection, pending)
+
+        insert_batched(Note, 'notes', rows(notes, lambda g, us, i: {'group_id': g, 'uploader_id': rng.choice(us), 'title': sentence(rng, 5),
+                                                          'content': sentence(rng, rng.randint(20, 80)), 'created_at': start + timedelta(minutes=i)}))
+        insert_batched(Meetup, 'meetups', rows(meetups, lambda g, us, i: {'group_id': g, 'creator_id': rng.choice(us), 'topic': sentence(rng, 4),
+                                                              'description': sentence(rng, 15), 'meetup_link': '', 'scheduled_time': start + timedelta(days=i)}))
+        insert_batched(ChatMessage, 'chat', rows(messages, lambda g, us, i: {'group_id': g, 'user_id': rng.choice(us), 'text': sentence(rng, rng.randint(3, 20)),
+                                                                     'timestamp': start + timedelta(seconds=30 * i)}))
+        db.session.commit()
+    return membership
@@ -0,0 +1,47 @@
+"""Compare the stdlib and orjson response encoders on a large group's notes.
+
+    cd backend && python -m benchmarks.json_encoding --notes 10000
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.json_provider import FastJSONProvider, orjson
+
+def synthetic_notes(count, seed=0):
+    rng = random.Random(seed)
+    words = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 10))) for _ in range(500)]
+    start = datetime(2024, 1, 1)
+    return [{'id': i, 'title': ' '.join(rng.choices(words, k=6)), 'content': ' '.join(rng.choices(words, k=rng.randint(20, 120))),
+             'uploader': f'user{rng.randint(1, 200)}', 'created_at': (start + timedelta(minutes=i)).isoformat()} for i in range(count)]
+
+def time_encoder(app, provider_class, payload, repeat):
+    provider = provider_class(app); samples = []
+    with app.app_context():
+        for _ in range(repeat):
+            began = time.perf_counter(); body = provider.response(payload).get_data(); samples.append(time.perf_counter() - began)
+    return {'median_ms': statistics.median(samples) * 1000, 'min_ms': min(samples) * 1000, 'bytes': len(body)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--notes', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+    payload = {'items': synthetic_notes(args.notes), 'before': None, 'after': None}
+    app = Flask(__name__)
+    results = {'notes': args.notes, 'orjson': orjson is not None,
+               'stdlib': time_encoder(app, DefaultJSONProvider, payload, args.repeat),
+               'fast': time_encoder(app, FastJSONProvider, payload, args.repeat)}
+    results['speedup'] = results['stdlib']['median_ms'] / results['fast']['median_ms']
+    if args.json: print(json.dumps(results)); return
+    for name in ('stdlib', 'fast'):
+        r = results[name]; print(f"{name:>7}: {r['median_ms']:8.2f} ms median  {r['min_ms']:8.2f} ms min  {r['bytes']} bytes")
+    print(f"speedup: {results['speedup']:.1f}x" + ('' if results['orjson'] else ' (orjson not installed; both paths use the stdlib)'))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""Load-test the PeerStudy API against a seeded synthetic dataset.
+
+    cd backend && python -m benchmarks.run --groups 20 --messages 5000 --requests 500 --threads 8 --json before.json
+    cd backend && python -m benchmarks.run --driver http --threads 16 --json after.json
+    cd backend && python -m benchmarks.compare before.json after.json
+    cd backend && python -m benchmarks.run --database postgresql://localhost/peerstudy_bench --recreate
+
+The test-client driver calls the app in-process, one client per thread. The http
+driver serves the app on a local threaded WSGI server (or uses --url) and drives
+it over keep-alive connections. Endpoints are measured one after another, so the
+queries-per-request figure is the statement count of each phase divided by its
+requests; with --url the statements run in another process and it is not
+reported. The sync phase asks for the changes after a token --sync-changes
+entries behind each group's seeded change log.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app
+from app.config import Config
+from app.models import db, ChangeLogEntry
+from .dataset import WORDS, seed
+
+ENDPOINTS = {
+    'groups': ('GET', '/api/groups', None),
+    'bootstrap': ('GET', '/api/groups/{group}/bootstrap', None),
+    'notes': ('GET', '/api/groups/{group}/notes', None),
+    'meetups': ('GET', '/api/groups/{group}/meetups', None),
+    'chat': ('GET', '/api/groups/{group}/chat', None),
+    'sync': ('GET', '/api/groups/{group}/sync?since={since}', None),
+    'search': ('GET', '/api/groups/{group}/search?q={word}', None),
+    'post_chat': ('POST', '/api/groups/{group}/chat', {'text': 'benchmark message'}),
+}
+
+class TestClientDriver:
+    def __init__(self, app): self.app = app; self.local = threading.local()
+    def close(self): pass
+
+    def request(self, method, path, body, token):
+        client = getattr(self.local, 'client', None) or self.app.test_client(); self.local.client = client
+        return client.open(path, method=method, json=body, headers={'Authorization': f'Bearer {token}'}).status_code
+
+class HttpDriver:
+    def __init__(self, app, url=None):
+        import requests
+        self.requests = requests; self.local = threading.local(); self.server = None
+        if url is None:
+            from werkzeug.serving import WSGIRequestHandler, make_server
+            class QuietHandler(WSGIRequestHandler):
+                def log_request(self, *args): pass
+            self.server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+            url = f'http://127.0.0.1:{self.server.server_port}'
+        self.url = url.rstrip('/')
+
+    def close(self):
+        if self.server: self.server.shutdown()
+
+    def request(self, method, path, body, token):
+        session = getattr(self.local, 'session', None) or self.requests.Session(); self.local.session = session
+        return session.request(method, self.url + path, json=body, headers={'Authorization': f'Bearer {token}'}).status_code
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0; self._lock = threading.Lock()
+        event.listen(engine, 'before_cursor_execute', self._count)
+    def _count(self, *args):
+        with self._lock: self.count += 1
+
+def percentile(samples, q):
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+def run_phase(driver, endpoint, calls, threads, counter):
+    method, template, body = ENDPOINTS[endpoint]
+    latencies = []; errors = [0]; lock = threading.Lock(); cursor = iter(calls)
+    def worker():
+        while True:
+            with lock: call = next(cursor, None)
+            if call is None: return
+            token, group, word, since = call
+            began = time.perf_counter()
+            try: status = driver.request(method, template.format(group=group, word=word, since=since), body, token)
+            except Exception: status = None
+            elapsed = time.perf_counter() - began
+            with lock:
+                latencies.append(elapsed)
+                if status is None or status >= 400: errors[0] += 1
+    statements = counter and counter.count; began = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for w in workers: w.start()
+    for w in workers: w.join()
+    wall = time.perf_counter() - began; latencies.sort()
+    return {'requests': len(latencies), 'errors': errors[0], 'throughput_rps': len(latencies) / wall, 'mean_ms': statistics.fmean(latencies) * 1000,
+            'p50_ms': percentile(latencies, 0.50) * 1000, 'p95_ms': percentile(latencies, 0.95) * 1000, 'p99_ms': percentile(latencies, 0.99) * 1000,
+            'queries_per_request': (counter.count - statements) / len(latencies) if counter else None}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0], formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument('--database', default=os.environ.get('BENCHMARK_DATABASE_URL'),
+                        help='SQLAlchemy URI (default: a temporary SQLite file). All its tables are dropped and re-seeded, so this requires --recreate')
+    parser.add_argument('--recreate', action='store_true', help='allow dropping and re-seeding the tables of --database / BENCHMARK_DATABASE_URL')
+    parser.add_argument('--users', type=int, default=50); parser.add_argument('--groups', type=int, default=20)
+    parser.add_argument('--members', type=int, default=10); parser.add_argument('--notes', type=int, default=200)
+    parser.add_argument('--meetups', type=int, default=20); parser.add_argument('--messages', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--driver', choices=('testclient', 'http'), default='testclient')
+    parser.add_argument('--url', help='benchmark a server that is already running (http driver); it must use --database')
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=10, help='unmeasured requests per endpoint')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--sync-changes', type=int, default=20, help='change-log entries each sync request is behind')
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS))
+    parser.add_argument('--no-cache', action='store_true', help='disable the response cache')
+    parser.add_argument('--json', metavar='PATH', help='also write the results as JSON')
+    args = parser.parse_args()
+    if args.database and not args.recreate:
+        parser.error(f"seeding drops every table in {args.database.split('@')[-1]}; pass --recreate if that is intended")
+
+    database = args.database or 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'peerstudy-benchmark.db')
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database
+        RESPONSE_CACHE_BACKEND = 'none' if args.no_cache else Config.RESPONSE_CACHE_BACKEND
+    app = create_app(BenchmarkConfig)
+    membership = seed(app, args.users, args.groups, args.members, args.notes, args.meetups, args.messages, args.seed)
+    with app.app_context():
+        tokens = {u: create_access_token(identity=str(u)) for us in membership.values() for u in us}
+        sync_tokens = {g: db.session.query(ChangeLogEntry.id).filter_by(group_id=g).order_by(ChangeLogEntry.id.desc()).offset(args.sync_changes).limit(1).scalar() or 0
+                       for g in membership}
+        # A server started separately (--url) runs its statements out of our sight.
+        counter = None if args.url else StatementCounter(db.engine)
+
+    rng = random.Random(args.seed)
+    def calls(count):
+        picked = []
+        for _ in range(count):
+            group = rng.choice(list(membership)); picked.append((tokens[rng.choice(membership[group])], group, rng.choice(WORDS)[:4], sync_tokens[group]))
+        return picked
+
+    driver = HttpDriver(app, args.url) if args.driver == 'http' else TestClientDriver(app)
+    results = {}
+    try:
+        for endpoint in args.endpoints.split(','):
+            if args.warmup: run_phase(driver, endpoint, calls(args.warmup), args.threads, counter)
+            results[endpoint] = run_phase(driver, endpoint, calls(args.requests), args.threads, counter)
+            r = results[endpoint]; queries = 'n/a' if r['queries_per_request'] is None else f"{r['queries_per_request']:.1f}"
+            print(f"{endpoint:>10}: p50 {r['p50_ms']:7.2f}ms  p95 {r['p95_ms']:7.2f}ms  p99 {r['p99_ms']:7.2f}ms  "
+                  f"{r['throughput_rps']:8.1f} req/s  {queries:>5} queries/req  {r['errors']} errors")
+    finally:
+        driver.close()
+    if args.json:
+        config = {k: v for k, v in vars(args).items() if k != 'json'}
+        with open(args.json, 'w') as f: json.dump({'config': {**config, 'database': database.split('@')[-1]}, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Add full-text search indexes on notes and meetups
+
+Revision ID: b71f0e93c2a8
+Revises: 9d4e6b1a7c35
+Create Date: 2026-10-17 14:05:27.104935
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71f0e93c2a8'
+down_revision = '9d4e6b1a7c35'
+branch_labels = None
+depends_on = None
+
+# Must stay identical to app.models.search_document, or the planner won't use them.
+NOTE_DOCUMENT = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(content, ''))"
+MEETUP_DOCUMENT = "to_tsvector('english', coalesce(topic, '') || ' ' || coalesce(description, ''))"
+
+
+# SQLite has no GIN; it gets external-content FTS5 tables kept in sync by triggers,
+# the same DDL app.search installs on create_all.
+SQLITE_FTS = {'note': ('note_fts', ('title', 'content')), 'meetup': ('meetup_fts', ('topic', 'description'))}
+
+
+def sqlite_fts_ddl(table, fts_table, columns):
+    cols = ', '.join(columns)
+    new_cols = ', '.join(f'new.{c}' for c in columns); old_cols = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {fts_table} USING fts5({cols}, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER {fts_table}_ai AFTER INSERT ON {table} BEGIN INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+        f"CREATE TRIGGER {fts_table}_ad AFTER DELETE ON {table} BEGIN INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); END",
+        f"CREATE TRIGGER {fts_table}_au AFTER UPDATE ON {table} BEGIN INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+        f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')",
+    ]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.create_index('ix_note_search', 'note', [sa.text(NOTE_DOCUMENT)], unique=False, postgresql_using='gin')
+        op.create_index('ix_meetup_search', 'meetup', [sa.text(MEETUP_DOCUMENT)], unique=False, postgresql_using='gin')
+    elif dialect == 'sqlite':
+        for table, (fts_table, columns) in SQLITE_FTS.items():
+            for statement in sqlite_fts_ddl(table, fts_table, columns): op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_meetup_search', table_name='meetup')
+        op.drop_index('ix_note_search', table_name='note')
+    elif dialect == 'sqlite':
+        for fts_table, _ in SQLITE_FTS.values():
+            for suffix in ('ai', 'ad', 'au'): op.execute(f"DROP TRIGGER IF EXISTS {fts_table}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {fts_table}")
@@ -0,0 +1,55 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app
+from app.config import Config
+from app.models import db, group_members, User, Group
+
+class TestConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    TESTING = True
+    BCRYPT_LOG_ROUNDS = 4
+    RESPONSE_CACHE_BACKEND = 'none'
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove(); db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_user(app):
+    """Create a user; returns ``(user, auth headers)``."""
+    def make(username):
+        user = User(username=username, email=f'{username}@example.com', password_hash='x')
+        db.session.add(user); db.session.commit()
+        return user, {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+    return make
+
+@pytest.fixture
+def make_group(app):
+    def make(creator, *members, name='Group'):
+        group = Group(name=name, course_code='TEST-1', join_code=f'J{Group.query.count():07d}', creator_id=creator.id)
+        db.session.add(group); db.session.flush()
+        db.session.execute(group_members.insert(), [{'user_id': u.id, 'group_id': group.id} for u in (creator, *members)])
+        db.session.commit()
+        return group
+    return make
+
+class QueryCounter:
+    """Counts the SQL statements run on ``engine`` inside the block."""
+
+    def __init__(self, engine): self.engine = engine; self.count = 0
+    def _count(self, *args): self.count += 1
+    def __enter__(self): event.listen(self.engine, 'before_cursor_execute', self._count); return self
+    def __exit__(self, *exc): event.remove(self.engine, 'before_cursor_execute', self._count)
+
+@pytest.fixture
+def count_queries(app):
+    return lambda: QueryCounter(db.engine)
@@ -0,0 +1,19 @@
+from app.events import broker
+from app.models import db
+
+def test_events_are_delivered_on_commit_only(client, make_user, make_group):
+    alice, headers = make_user('alice'); group = make_group(alice)
+    subscription = broker.subscribe(group.id)
+    try:
+        broker.publish(group.id, 'note', {'id': 1})
+        assert subscription.get(timeout=0) is None
+        db.session.rollback()
+        broker.publish(group.id, 'note', {'id': 2}); db.session.commit()
+        assert subscription.get(timeout=0) == ('note', {'id': 2})
+        assert subscription.get(timeout=0) is None
+
+        response = client.post(f'/api/groups/{group.id}/chat', json={'text': 'hi'}, headers=headers)
+        assert response.status_code == 201
+        assert subscription.get(timeout=0) == ('chat_message', response.get_json())
+    finally:
+        broker.unsubscribe(group.id, subscription)
@@ -0,0 +1,22 @@
+import json
+from datetime import datetime
+import pytest
+from app.models import db, Note, Meetup, ChatMessage
+
+@pytest.mark.parametrize('debug', [False, True])
+def test_export_imports_back(app, client, make_user, make_group, debug):
+    app.debug = debug
+    alice, headers = make_user('alice'); source, target = make_group(alice), make_group(alice)
+    db.session.add_all([Note(title='Limits', content='Review\nchapter 1', uploader_id=alice.id, group_id=source.id),
+                        Meetup(topic='Review', description='', scheduled_time=datetime(2025, 3, 1, 18), creator_id=alice.id, group_id=source.id),
+                        ChatMessage(text='hi', user_id=alice.id, group_id=source.id)])
+    db.session.commit()
+
+    export = client.get(f'/api/groups/{source.id}/export', headers=headers)
+    assert export.status_code == 200
+    assert [json.loads(line)['type'] for line in export.get_data(as_text=True).splitlines()] == ['group', 'notes', 'meetups', 'chat']
+
+    response = client.post(f'/api/groups/{target.id}/import', data=export.get_data(), headers={**headers, 'Content-Type': 'application/x-ndjson'})
+    assert response.status_code == 201, response.get_json()
+    assert response.get_json()['imported'] == {'notes': 1, 'meetups': 1, 'chat': 1}
+    assert Note.query.filter_by(group_id=target.id).one().content == 'Review\nchapter 1'
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from app.models import db, Note, Meetup, ChatMessage
+
+# The paginated group queries must be answered from the composite
+# (group_id, sort key, id) indexes: a search on the index, no table scan and no
+# sort step, for the first page and for a page after a cursor.
+
+INDEXES = {'notes': 'note USING INDEX ix_note_group_id_created_at', 'meetups': 'meetup USING INDEX ix_meetup_group_id_scheduled_time',
+           'chat': 'chat_message USING INDEX ix_chat_message_group_id_timestamp'}
+
+def page_plans(client, headers, url):
+    """EXPLAIN QUERY PLAN for the SELECTs run by ``url``."""
+    statements = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'ORDER BY' in statement: statements.append((statement, parameters))
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try: response = client.get(url, headers=headers)
+    finally: event.remove(db.engine, 'before_cursor_execute', capture)
+    assert response.status_code == 200
+    with db.engine.connect() as conn:
+        return response.get_json(), [' | '.join(row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {s}', p)) for s, p in statements]
+
+@pytest.mark.parametrize('collection', ['notes', 'meetups', 'chat'])
+def test_paginated_queries_use_group_index(client, make_user, make_group, collection):
+    alice, headers = make_user('alice'); group, other = make_group(alice), make_group(alice)
+    start = datetime(2025, 1, 1)
+    for g in (group, other):
+        for i in range(30):
+            db.session.add_all([Note(title='t', content='c', uploader_id=alice.id, group_id=g.id, created_at=start + timedelta(minutes=i)),
+                                Meetup(topic='t', scheduled_time=start + timedelta(days=i), creator_id=alice.id, group_id=g.id),
+                                ChatMessage(text='m', user_id=alice.id, group_id=g.id, timestamp=start + timedelta(seconds=i))])
+    db.session.commit()
+
+    url = f'/api/groups/{group.id}/{collection}?limit=10'
+    page, plans = page_plans(client, headers, url)
+    cursor = 'before' if page['before'] else 'after'
+    _, cursor_plans = page_plans(client, headers, f"{url}&{cursor}={page[cursor]}")
+    assert len(plans) == len(cursor_plans) == 1
+    for plan in plans + cursor_plans:
+        assert f'SEARCH {INDEXES[collection]}' in plan, plan
+        assert 'SCAN' not in plan and 'TEMP B-TREE' not in plan, plan
@@ -0,0 +1,41 @@
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask_jwt_extended import create_access_token
+from app import create_app, routes
+from app.models import db, group_members, User, Group
+from .conftest import TestConfig
+
+def test_parallel_group_creation_gets_unique_codes(tmp_path, monkeypatch):
+    # A real database file (or TEST_DATABASE_URL) so the threads' transactions
+    # actually contend, and a code space small enough to force collisions.
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or f"sqlite:///{tmp_path / 'groups.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {} if os.environ.get('TEST_DATABASE_URL') else {'connect_args': {'timeout': 60}}
+    app = create_app(FileConfig)
+    drawn = []; lock = threading.Lock()
+    def small_code_space(length=6):
+        code = f'{random.randrange(20000):06d}'
+        with lock: drawn.append(code)
+        return code
+    monkeypatch.setattr(routes, 'generate_join_code', small_code_space)
+
+    with app.app_context():
+        db.drop_all(); db.create_all()
+        user = User(username='alice', email='alice@example.com', password_hash='x'); db.session.add(user); db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+    def create(n):
+        return app.test_client().post('/api/groups', json={'name': f'Group {n}'}, headers=headers).status_code
+    with ThreadPoolExecutor(8) as pool: statuses = list(pool.map(create, range(2000)))
+
+    with app.app_context():
+        try:
+            assert statuses.count(201) == 2000
+            codes = [code for (code,) in db.session.query(Group.join_code)]
+            assert len(codes) == len(set(codes)) == 2000
+            assert db.session.query(group_members).count() == 2000
+            assert len(drawn) > 2000  # some draws collided and were retried
+        finally:
+            db.session.remove(); db.drop_all()
@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+from app.models import db, Meetup
+
+def test_meetups_start_at_upcoming_sessions(client, make_user, make_group):
+    alice, headers = make_user('alice')
+    group = make_group(alice)
+    now = datetime.utcnow()
+    for days in (-3, -2, -1, 1, 2):
+        db.session.add(Meetup(topic=f'day {days}', scheduled_time=now + timedelta(days=days), creator_id=alice.id, group_id=group.id))
+    db.session.commit()
+
+    page = client.get(f'/api/groups/{group.id}/meetups', headers=headers).get_json()
+    assert [m['topic'] for m in page['items']] == ['day 1', 'day 2'] and page['after'] is None
+    past = client.get(f'/api/groups/{group.id}/meetups?before={page["before"]}&limit=2', headers=headers).get_json()
+    assert [m['topic'] for m in past['items']] == ['day -2', 'day -1']
+    past = client.get(f'/api/groups/{group.id}/meetups?before={past["before"]}&limit=2', headers=headers).get_json()
+    assert [m['topic'] for m in past['items']] == ['day -3'] and past['before'] is None
+
+    bootstrap = client.get(f'/api/groups/{group.id}/bootstrap', headers=headers).get_json()
+    assert bootstrap['meetups'] == page
+
+def test_meetups_without_upcoming_sessions_link_to_past_ones(client, make_user, make_group):
+    alice, headers = make_user('alice')
+    group = make_group(alice)
+    db.session.add(Meetup(topic='old', scheduled_time=datetime(2020, 1, 1), creator_id=alice.id, group_id=group.id)); db.session.commit()
+
+    page = client.get(f'/api/groups/{group.id}/meetups', headers=headers).get_json()
+    assert page['items'] == [] and page['before']
+    past = client.get(f'/api/groups/{group.id}/meetups?before={page["before"]}', headers=headers).get_json()
+    assert [m['topic'] for m in past['items']] == ['old']
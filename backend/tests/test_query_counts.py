@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+import pytest
+from app.models import db, Note, Meetup, ChatMessage
+
+# Each list endpoint must cost a fixed number of queries however many rows, authors
+# and groups it returns: author names come from a join, member counts from a
+# correlated subquery.
+
+def add_rows(group, authors, count):
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        author = authors[i % len(authors)]
+        db.session.add_all([
+            Note(title=f'note {i}', content='text', uploader_id=author.id, group_id=group.id, created_at=start + timedelta(minutes=i)),
+            Meetup(topic=f'meetup {i}', scheduled_time=start + timedelta(days=i), creator_id=author.id, group_id=group.id),
+            ChatMessage(text=f'message {i}', user_id=author.id, group_id=group.id, timestamp=start + timedelta(seconds=i)),
+        ])
+    db.session.commit()
+
+def queries_for(client, count_queries, url, headers):
+    client.get(url, headers=headers)  # warm the membership cache
+    with count_queries() as counter:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return counter.count
+
+@pytest.mark.parametrize('collection', ['notes', 'meetups', 'chat'])
+def test_group_list_queries_do_not_grow_with_rows(client, make_user, make_group, count_queries, collection):
+    (alice, headers), (bob, _), (carol, _) = make_user('alice'), make_user('bob'), make_user('carol')
+    small, large = make_group(alice, bob), make_group(alice, bob, carol)
+    add_rows(small, [alice], 2); add_rows(large, [alice, bob, carol], 40)
+
+    assert queries_for(client, count_queries, f'/api/groups/{small.id}/{collection}', headers) \
+        == queries_for(client, count_queries, f'/api/groups/{large.id}/{collection}', headers) <= 3
+
+def test_group_list_queries_do_not_grow_with_groups(client, make_user, make_group, count_queries):
+    (alice, headers), (bob, _), (carol, _) = make_user('alice'), make_user('bob'), make_user('carol')
+    make_group(alice)
+    one_group = queries_for(client, count_queries, '/api/groups', headers)
+    for n in range(10): make_group(alice, bob, carol, name=f'Group {n}')
+
+    assert queries_for(client, count_queries, '/api/groups', headers) == one_group
+    groups = client.get('/api/groups', headers=headers).get_json()
+    assert [g['member_count'] for g in groups] == [1] + [3] * 10
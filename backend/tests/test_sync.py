@@ -0,0 +1,11 @@
+def test_deleted_group_tombstone_reaches_former_members(client, make_user, make_group):
+    (alice, headers), (bob, bob_headers) = make_user('alice'), make_user('bob')
+    group = make_group(alice); group_id = group.id
+    token = client.get(f'/api/groups/{group_id}/sync', headers=headers).get_json()['token']
+    assert client.get(f'/api/groups/{group_id}/sync?since={token}', headers=bob_headers).status_code == 403
+
+    assert client.post(f'/api/groups/{group_id}/leave', headers=headers).status_code == 200
+    response = client.get(f'/api/groups/{group_id}/sync?since={token}', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['deleted'] == [{'type': 'group', 'id': group_id}]
+    assert client.get(f'/api/groups/{group_id}/sync?since={token}', headers=bob_headers).status_code == 403
@@ -0,0 +1,83 @@
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+class ApiClient:
+    """Shared HTTP client for the PeerStudy API.
+
+    One keep-alive connection pool per host, bounded timeouts, jittered retries for
+    idempotent requests and an LRU ETag cache for GETs (bounded by ``cache_entries``
+    and ``cache_bytes``). ``submit`` runs a call on a
+    small thread pool and hands ``(result, error)`` to a callback, so independent
+    calls can be issued concurrently without blocking the UI.
+    """
+
+    def __init__(self, base_url, timeout=(5, 30), retries=3, backoff=0.3, pool_size=10, max_workers=4, cache_entries=256, cache_bytes=16 * 1024 * 1024):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(total=retries, backoff_factor=backoff, backoff_jitter=backoff, status_forcelist=(502, 503, 504),
+                      allowed_methods=Retry.DEFAULT_ALLOWED_METHODS, respect_retry_after_header=True, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('http://', adapter); self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='api')
+        self.cache_entries, self.cache_bytes = cache_entries, cache_bytes
+        self.cache_lock = threading.Lock()
+        self.response_cache = OrderedDict()  # endpoint -> (etag, result, size), least recently used first
+        self.cache_size = 0
+
+    def request(self, method, endpoint, data=None, token=None):
+        method = method.upper()
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        headers['Content-Type'] = 'application/json'
+        cached = self.cached(endpoint) if method == 'GET' else None
+        if cached: headers['If-None-Match'] = cached[0]
+        try:
+            response = self.session.request(method, url=f"{self.base_url}{endpoint}", json=data, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+            if response.status_code == 304 and cached: return cached[1], None
+            result = response.json() if response.content else {"success": True}
+            if method == 'GET' and response.headers.get('ETag'): self.cache(endpoint, response.headers['ETag'], result, len(response.content))
+            return result, None
+        except requests.exceptions.RequestException as e:
+            error_message = f"API Error: {e}"
+            if e.response is not None:
+                try:
+                    error_data = e.response.json()
+                    error_message = error_data.get('message', error_data.get('msg', str(e)))
+                except json.JSONDecodeError: pass
+            return None, error_message
+
+    def cached(self, endpoint):
+        with self.cache_lock:
+            if endpoint not in self.response_cache: return None
+            self.response_cache.move_to_end(endpoint)
+            return self.response_cache[endpoint]
+
+    def cache(self, endpoint, etag, result, size):
+        with self.cache_lock:
+            if endpoint in self.response_cache: self.cache_size -= self.response_cache.pop(endpoint)[2]
+            if size > self.cache_bytes: return
+            self.response_cache[endpoint] = (etag, result, size); self.cache_size += size
+            while len(self.response_cache) > self.cache_entries or self.cache_size > self.cache_bytes:
+                self.cache_size -= self.response_cache.popitem(last=False)[1][2]
+
+    def submit(self, method, endpoint, data=None, token=None, callback=None):
+        future = self.executor.submit(self.request, method, endpoint, data, token)
+        if callback: future.add_done_callback(lambda f: callback(*f.result()))
+        return future
+
+    def gather(self, *calls, token=None):
+        """Run ``(method, endpoint[, data])`` calls concurrently; returns their ``(result, error)`` pairs in order."""
+        futures = [self.submit(call[0], call[1], call[2] if len(call) > 2 else None, token) for call in calls]
+        return [f.result() for f in futures]
+
+    def stream(self, endpoint, token=None, read_timeout=60):
+        return self.session.get(f"{self.base_url}{endpoint}", headers={'Authorization': f'Bearer {token}'} if token else {}, stream=True, timeout=(self.timeout[0], read_timeout))
+
+    def clear_cache(self):
+        with self.cache_lock: self.response_cache.clear(); self.cache_size = 0
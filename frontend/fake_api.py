@@ -0,0 +1,348 @@
+"""Deterministic stand-in for the PeerStudy API, for running and profiling the Flet clients without a backend.
+
+    python frontend/fake_api.py --groups 2000 --messages 1000000 --latency 0.05 --error-rate 0.01 --port 5001
+    PEERSTUDY_API_URL=http://127.0.0.1:5001/api flet run frontend/main.py
+
+Every item is derived from (seed, group, collection, index), so a group of any
+size costs nothing until a page of it is requested, and runs with the same seed
+see the same data. FakeApi has the request/submit/gather/stream interface of
+ApiClient and can replace it in-process; serve() exposes the same routes over
+HTTP. Writes are kept in memory and published to event streams like the real API.
+"""
+import argparse
+import bisect
+import json
+import queue
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+WORDS = ('algebra', 'calculus', 'derivative', 'integral', 'matrix', 'vector', 'proof', 'theorem', 'lemma', 'graph', 'network',
+         'protocol', 'compiler', 'parser', 'kernel', 'thread', 'memory', 'cache', 'entropy', 'quantum', 'enzyme', 'protein',
+         'essay', 'history', 'economics', 'market', 'chapter', 'lecture', 'review', 'exam', 'homework', 'summary', 'notes')
+# Generated notes and messages end here and meetups start here, so anything posted later sorts after them.
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+EVENT_TYPES = {'notes': 'note', 'meetups': 'meetup', 'chat': 'chat_message'}
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+def item_id(group_id, index):
+    return group_id * 10**10 + index + 1
+
+class FakeDataset:
+    """Groups ``1..groups`` with generated content, plus fixed ``fixtures`` groups and anything written since."""
+
+    def __init__(self, groups=20, notes=200, meetups=20, messages=1000, members=8, seed=0, username='testuser', fixtures=None):
+        self.group_count, self.members, self.seed, self.username = groups, members, seed, username
+        self.counts = {'notes': notes, 'meetups': meetups, 'chat': messages}
+        self.fixtures = fixtures or {}  # group_id -> {'group': {...}, 'notes': [...], 'meetups': [...], 'chat': [...]}
+        self.posted = {}                # (group_id, collection) -> items written through the API
+        self.changes = {}               # group_id -> [(collection, item)], the sync log
+        self.left = set()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def demo(cls, username):
+        """The fixed two-group dataset shown by DemoFrontend's demo mode."""
+        def items(group_id, rows): return [{'id': item_id(group_id, i), **row} for i, row in enumerate(rows)]
+        fixtures = {
+            101: {'group': {'id': 101, 'name': 'Calculus Crew', 'course_code': 'MATH-101', 'member_count': 4, 'join_code': 'CALC-ABC'},
+                  'notes': items(101, [
+                      {'title': 'Chapter 1: Limits', 'content': 'Remember to review L\'Hôpital\'s rule.', 'uploader': 'Alice', 'created_at': '2024-12-01T10:00:00+00:00'},
+                      {'title': 'Useful Link for Derivatives', 'content': 'https://www.mathsisfun.com/calculus/derivatives-rules.html', 'uploader': 'Bob', 'created_at': '2024-11-28T09:00:00+00:00'}]),
+                  'meetups': items(101, [
+                      {'topic': 'Problem Set 5 Walkthrough', 'time': '2024-12-27T19:30:00+00:00', 'description': 'We will work through the tough questions together.', 'link': '', 'creator': 'Bob'},
+                      {'topic': 'Midterm Review Session', 'time': datetime.now(timezone.utc).isoformat(), 'description': 'Covering chapters 1-4. Bring questions!', 'link': 'https://zoom.us/j/1234567890', 'creator': 'Alice'}]),
+                  'chat': items(101, [
+                      {'author': 'Alice', 'text': 'Hey everyone, ready for the midterm?', 'timestamp': '2024-12-02T18:00:00+00:00'},
+                      {'author': username, 'text': 'I am! Just need to review chapter 3.', 'timestamp': '2024-12-02T18:01:00+00:00'},
+                      {'author': 'Bob', 'text': 'Same here. That section on related rates is tricky.', 'timestamp': '2024-12-02T18:03:00+00:00'}])},
+            102: {'group': {'id': 102, 'name': 'Physics Phantoms', 'course_code': 'PHY-203', 'member_count': 2, 'join_code': 'PHYS-XYZ'}},
+        }
+        return cls(groups=0, username=username, fixtures=fixtures)
+
+    def rng(self, *key):
+        return random.Random(f"{self.seed}:" + ':'.join(map(str, key)))
+
+    def author(self, rng):
+        return self.username if rng.random() < 0.1 else f"student{rng.randint(1, self.members)}"
+
+    def group_ids(self):
+        return [g for g in [*self.fixtures, *range(1, self.group_count + 1)] if g not in self.left]
+
+    def group(self, group_id):
+        if group_id in self.fixtures: return self.fixtures[group_id]['group']
+        if not 1 <= group_id <= self.group_count: return None
+        rng = self.rng(group_id, 'group')
+        return {'id': group_id, 'name': f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {group_id}",
+                'course_code': f"{rng.choice(('MATH', 'PHY', 'CS', 'BIO', 'HIST'))}-{rng.randint(100, 499)}",
+                'member_count': rng.randint(2, self.members), 'join_code': f"G{group_id:05d}", 'description': sentence(rng, 12)}
+
+    def base_count(self, group_id, collection):
+        if group_id in self.fixtures: return len(self.fixtures[group_id].get(collection, ()))
+        return self.counts[collection] if 1 <= group_id <= self.group_count else 0
+
+    def count(self, group_id, collection):
+        return self.base_count(group_id, collection) + len(self.posted.get((group_id, collection), ()))
+
+    def item(self, group_id, collection, index):
+        base = self.base_count(group_id, collection)
+        if index >= base: return self.posted[(group_id, collection)][index - base]
+        if group_id in self.fixtures: return self.fixtures[group_id][collection][index]
+        rng = self.rng(group_id, collection, index)
+        if collection == 'notes':
+            return {'id': item_id(group_id, index), 'title': sentence(rng, 5).capitalize(), 'content': sentence(rng, rng.randint(10, 60)),
+                    'uploader': self.author(rng), 'created_at': (BASE_TIME - timedelta(minutes=base - index)).isoformat()}
+        if collection == 'meetups':
+            return {'id': item_id(group_id, index), 'topic': sentence(rng, 4).capitalize(), 'description': sentence(rng, 15), 'creator': self.author(rng),
+                    'link': f'https://meet.example.com/{group_id}-{index}' if rng.random() < 0.5 else '', 'time': (BASE_TIME + timedelta(days=index)).isoformat()}
+        return {'id': item_id(group_id, index), 'text': sentence(rng, rng.randint(3, 25)), 'author': self.author(rng),
+                'timestamp': (BASE_TIME - timedelta(seconds=30 * (base - index))).isoformat()}
+
+    def add(self, group_id, collection, item):
+        with self.lock:
+            item = {'id': item_id(group_id, self.count(group_id, collection)), **item}
+            self.posted.setdefault((group_id, collection), []).append(item)
+            self.changes.setdefault(group_id, []).append((collection, item))
+        return item
+
+class FakeApi:
+    """Answers the PeerStudy API routes from a FakeDataset, with optional injected latency and failures."""
+
+    ROUTES = [
+        ('POST', r'/login', 'login'), ('POST', r'/register', 'register'),
+        ('GET', r'/groups', 'groups'), ('POST', r'/groups', 'create_group'), ('POST', r'/groups/join', 'join_group'),
+        ('GET', r'/groups/(\d+)', 'group'), ('GET', r'/groups/(\d+)/bootstrap', 'bootstrap'),
+        ('GET', r'/groups/(\d+)/(notes|meetups|chat)', 'page'), ('POST', r'/groups/(\d+)/(notes|meetups|chat)', 'post'),
+        ('GET', r'/groups/(\d+)/sync', 'sync'), ('GET', r'/groups/(\d+)/search', 'search'), ('POST', r'/groups/(\d+)/leave', 'leave'),
+    ]
+
+    def __init__(self, dataset=None, latency=0.0, jitter=0.0, error_rate=0.0, page_size=50, keepalive=15, seed=0, max_workers=4):
+        self.dataset = dataset or FakeDataset(seed=seed)
+        self.latency, self.jitter, self.error_rate, self.page_size, self.keepalive = latency, jitter, error_rate, page_size, keepalive
+        self.faults = random.Random(seed); self.faults_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fake-api')
+        self.subscribers = {}; self.subscribers_lock = threading.Lock()
+
+    # ApiClient interface
+
+    def request(self, method, endpoint, data=None, token=None):
+        if self.inject(): return None, "API Error: injected failure"
+        status, payload = self.dispatch(method.upper(), endpoint, data)
+        return (None, payload.get('message')) if status >= 400 else (payload, None)
+
+    def submit(self, method, endpoint, data=None, token=None, callback=None):
+        future = self.executor.submit(self.request, method, endpoint, data, token)
+        if callback: future.add_done_callback(lambda f: callback(*f.result()))
+        return future
+
+    def gather(self, *calls, token=None):
+        futures = [self.submit(call[0], call[1], call[2] if len(call) > 2 else None, token) for call in calls]
+        return [f.result() for f in futures]
+
+    def stream(self, endpoint, token=None, read_timeout=60):
+        return EventStream(self, int(re.fullmatch(r'/groups/(\d+)/events', endpoint).group(1)))
+
+    def clear_cache(self): pass
+
+    # Routing
+
+    def inject(self):
+        """Sleep for the configured latency; True if this call should fail."""
+        with self.faults_lock: delay = self.latency + self.faults.uniform(0, self.jitter); fail = self.faults.random() < self.error_rate
+        if delay: time.sleep(delay)
+        return fail
+
+    def dispatch(self, method, endpoint, data=None):
+        """Route one call like the real API; returns ``(status, payload)``."""
+        path, _, query = endpoint.partition('?')
+        for route_method, pattern, name in self.ROUTES:
+            match = re.fullmatch(pattern, path.rstrip('/'))
+            if match and route_method == method:
+                params = [int(p) if p.isdigit() else p for p in match.groups()]
+                if params and self.dataset.group(params[0]) is None: return 404, {'message': 'Group not found'}
+                return getattr(self, f'_{name}')(dict(parse_qsl(query)), data or {}, *params)
+        return 404, {'message': 'Not found'}
+
+    def publish(self, group_id, event_type, data):
+        with self.subscribers_lock: subscribers = list(self.subscribers.get(group_id, ()))
+        for subscriber in subscribers: subscriber.put((event_type, data))
+
+    def _login(self, args, data):
+        return 200, {'access_token': f"fake-token-{data.get('username')}", 'user_id': 1}
+
+    def _register(self, args, data):
+        return 201, {'message': 'User registered successfully'}
+
+    def _groups(self, args, data):
+        return 200, [{k: v for k, v in self.dataset.group(g).items() if k != 'description'} for g in self.dataset.group_ids()]
+
+    def _group(self, args, data, group_id):
+        return 200, {'id': group_id, 'name': self.dataset.group(group_id)['name']}
+
+    def _create_group(self, args, data):
+        with self.dataset.lock:
+            group_id = max([*self.dataset.fixtures, self.dataset.group_count]) + 1
+            self.dataset.fixtures[group_id] = {'group': {'id': group_id, 'name': data.get('name'), 'course_code': data.get('course_code', ''), 'member_count': 1,
+                                                         'join_code': f"N{group_id:05d}", 'description': data.get('description', '')}}
+        return 201, {'message': 'Group created', 'group_id': group_id}
+
+    def _join_group(self, args, data):
+        code = data.get('join_code', '').strip().upper(); generated = re.fullmatch(r'G(\d+)', code)
+        group = self.dataset.group(int(generated.group(1))) if generated else \
+            next((f['group'] for f in self.dataset.fixtures.values() if f['group']['join_code'] == code), None)
+        if group is None or group['join_code'] != code: return 404, {'message': 'Invalid join code'}
+        if group['id'] not in self.dataset.left: return 409, {'message': 'You are already a member'}
+        self.dataset.left.discard(group['id'])
+        return 200, {'message': f"Successfully joined group: {group['name']}"}
+
+    def _leave(self, args, data, group_id):
+        self.dataset.left.add(group_id)
+        return 200, {'message': f"You have successfully left the group '{self.dataset.group(group_id)['name']}'."}
+
+    def _page(self, args, data, group_id, collection):
+        if not all(args.get(c, '0').isdigit() for c in ('before', 'after', 'limit')): return 400, {'message': 'Invalid cursor'}
+        limit = int(args.get('limit') or self.page_size); count = self.dataset.count(group_id, collection)
+        if collection == 'meetups' and 'before' not in args:
+            # Like the API, the first page starts at today's sessions and links back to past ones.
+            start = int(args['after']) if 'after' in args else self.upcoming_index(group_id, count); end = min(count, start + limit)
+            return 200, {'items': [self.dataset.item(group_id, collection, i) for i in range(start, end)],
+                         'before': str(start) if start > 0 and 'after' not in args else None, 'after': str(end) if end < count else None}
+        end = min(count, int(args.get('before', count))); start = max(0, end - limit)
+        indices = range(start, end) if collection != 'notes' else range(end - 1, start - 1, -1)
+        return 200, {'items': [self.dataset.item(group_id, collection, i) for i in indices], 'before': str(start) if start > 0 else None, 'after': None}
+
+    def upcoming_index(self, group_id, count):
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        def time_of(index):
+            when = datetime.fromisoformat(self.dataset.item(group_id, 'meetups', index)['time'])
+            return when if when.tzinfo else when.replace(tzinfo=timezone.utc)
+        return bisect.bisect_left(range(count), today, key=time_of)
+
+    def _bootstrap(self, args, data, group_id):
+        pages = {c: self._page({'limit': args.get('limit', str(self.page_size))}, {}, group_id, c)[1] for c in EVENT_TYPES}
+        return 200, {'group': self.dataset.group(group_id), 'token': str(len(self.dataset.changes.get(group_id, ()))), **pages}
+
+    def _post(self, args, data, group_id, collection):
+        now = datetime.now(timezone.utc).isoformat(); user = self.dataset.username
+        if collection == 'notes': item = {'title': data.get('title', ''), 'content': data.get('content', ''), 'uploader': user, 'created_at': now}
+        elif collection == 'meetups': item = {'topic': data.get('topic', ''), 'description': data.get('description', ''), 'link': data.get('link', ''), 'time': data.get('time', now), 'creator': user}
+        else: item = {'text': data.get('text', ''), 'author': user, 'timestamp': now}
+        item = self.dataset.add(group_id, collection, item)
+        self.publish(group_id, EVENT_TYPES[collection], item)
+        return 201, item
+
+    def _sync(self, args, data, group_id):
+        changes = self.dataset.changes.get(group_id, []); since = args.get('since')
+        result = {'token': str(len(changes)), 'reset': False, 'deleted': [], **{c: [] for c in EVENT_TYPES}}
+        if since is None or not since.isdigit() or int(since) > len(changes): return 200, {**result, 'reset': True}
+        for collection, item in changes[int(since):]: result[collection].append(item)
+        return 200, result
+
+    def _search(self, args, data, group_id, scan=5000):
+        terms = re.findall(r'\w+', args.get('q', '').lower())
+        if not terms: return 400, {'message': 'A search query is required'}
+        fields = {'notes': ('title', 'content'), 'meetups': ('topic', 'description')}
+        result = {}
+        for collection in [args['type']] if args.get('type') else list(fields):
+            count = self.dataset.count(group_id, collection); matches = []
+            # Newest first, over at most ``scan`` items so huge groups stay responsive.
+            for index in range(count - 1, max(-1, count - 1 - scan), -1):
+                item = self.dataset.item(group_id, collection, index)
+                words = re.findall(r'\w+', ' '.join(item.get(f) or '' for f in fields[collection]).lower())
+                if all(any(w.startswith(t) for w in words) for t in terms): matches.append(item)
+                if len(matches) == self.page_size: break
+            result[collection] = {'items': matches, 'next_offset': None}
+        return 200, result
+
+class EventStream:
+    """A fake streaming response for /groups/<id>/events, as returned by ApiClient.stream."""
+
+    def __init__(self, api, group_id):
+        self.api, self.group_id = api, group_id
+        self.events = queue.Queue(); self.closed = False
+        with api.subscribers_lock: api.subscribers.setdefault(group_id, []).append(self.events)
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    def close(self):
+        self.closed = True
+        with self.api.subscribers_lock:
+            if self.events in self.api.subscribers.get(self.group_id, ()): self.api.subscribers[self.group_id].remove(self.events)
+
+    def raise_for_status(self): pass
+
+    def iter_lines(self, decode_unicode=True):
+        yield ': connected'; yield ''
+        while not self.closed:
+            try: event_type, data = self.events.get(timeout=self.api.keepalive)
+            except queue.Empty: yield ': keepalive'; yield ''; continue
+            yield f'event: {event_type}'; yield f'data: {json.dumps(data)}'; yield ''
+
+def make_handler(api):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        def log_message(self, *args): pass
+        def do_GET(self): self.handle_api('GET')
+        def do_POST(self): self.handle_api('POST')
+
+        def send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status); self.send_header('Content-Type', 'application/json'); self.send_header('Content-Length', str(len(body))); self.end_headers()
+            self.wfile.write(body)
+
+        def handle_api(self, method):
+            if not self.path.startswith('/api/'): return self.send_json(404, {'message': 'Not found'})
+            endpoint = self.path[len('/api'):]
+            events = re.fullmatch(r'/groups/(\d+)/events', endpoint.partition('?')[0])
+            if method == 'GET' and events: return self.stream_events(endpoint.partition('?')[0])
+            length = int(self.headers.get('Content-Length') or 0)
+            try: data = json.loads(self.rfile.read(length)) if length else None
+            except ValueError: return self.send_json(400, {'message': 'Invalid JSON'})
+            if api.inject(): return self.send_json(503, {'message': 'Injected failure'})
+            self.send_json(*api.dispatch(method, endpoint, data))
+
+        def stream_events(self, endpoint):
+            # Chunked like the real server, one chunk per event, so clients reading in blocks still see each event at once.
+            self.close_connection = True
+            self.send_response(200); self.send_header('Content-Type', 'text/event-stream'); self.send_header('Cache-Control', 'no-cache'); self.send_header('Transfer-Encoding', 'chunked'); self.end_headers()
+            with api.stream(endpoint) as stream:
+                event = []
+                try:
+                    for line in stream.iter_lines():
+                        event.append(line)
+                        if line: continue
+                        chunk = '\n'.join(event).encode() + b'\n'; event = []
+                        self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk)); self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError): pass
+    return Handler
+
+def serve(api, host='127.0.0.1', port=5001):
+    server = ThreadingHTTPServer((host, port), make_handler(api)); server.daemon_threads = True
+    print(f"Fake PeerStudy API on http://{host}:{server.server_port}/api")
+    server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0], formatter_class=argparse.RawDescriptionHelpFormatter, epilog=__doc__)
+    parser.add_argument('--groups', type=int, default=20); parser.add_argument('--members', type=int, default=8)
+    parser.add_argument('--notes', type=int, default=200); parser.add_argument('--meetups', type=int, default=20)
+    parser.add_argument('--messages', type=int, default=1000, help='chat messages per group')
+    parser.add_argument('--seed', type=int, default=0); parser.add_argument('--username', default='testuser')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every call')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random seconds, uniform in [0, jitter]')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of calls answered with 503')
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--host', default='127.0.0.1'); parser.add_argument('--port', type=int, default=5001)
+    args = parser.parse_args()
+    dataset = FakeDataset(args.groups, args.notes, args.meetups, args.messages, args.members, args.seed, args.username)
+    serve(FakeApi(dataset, args.latency, args.jitter, args.error_rate, args.page_size, seed=args.seed), args.host, args.port)
+
+if __name__ == '__main__':
+    main()
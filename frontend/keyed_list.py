@@ -0,0 +1,100 @@
+class KeyedListView:
+    """Renders a list of item dicts into an ``ft.ListView``, reconciling rows by key.
+
+    Rows whose item is unchanged keep their control object, so Flet's update only
+    carries the rows that were inserted, removed or changed instead of the whole
+    list. ``header``/``footer`` controls (e.g. "Load more" buttons) are kept around
+    the rows, and ``empty`` is shown when there are no items.
+    """
+
+    def __init__(self, list_view, build, key=lambda item: item['id']):
+        self.list_view = list_view; self.build = build; self.key = key
+        self.rows = {}; self.items = []; self.footer = ()
+
+    def sync(self, items, header=(), footer=(), empty=None):
+        rows = {}
+        for item in items:
+            row = self.rows.get(self.key(item))
+            rows[self.key(item)] = row if row and row[0] == item else (item, self.build(item))
+        self.rows = rows; self.items = list(items); self.footer = tuple(footer)
+        body = [rows[self.key(item)][1] for item in items] or ([empty] if empty is not None else [])
+        self.list_view.controls = [*header, *body, *footer]
+
+    def append(self, item):
+        """Add one item after the current rows; sends a single new control."""
+        key = self.key(item)
+        if key in self.rows: return
+        if not self.rows: return self.sync([item], footer=self.footer)
+        self.rows[key] = (item, self.build(item)); self.items.append(item)
+        self.list_view.controls.insert(len(self.list_view.controls) - len(self.footer), self.rows[key][1])
+
+    def placeholder(self, *controls):
+        """Replace the rows with ``controls`` (e.g. a loading indicator), or with nothing."""
+        self.rows = {}; self.items = []; self.footer = ()
+        self.list_view.controls = list(controls)
+
+class WindowedListView(KeyedListView):
+    """A KeyedListView that only materializes a window of ``size`` items.
+
+    Scrolling near an edge slides the window by ``step`` items, and controls that
+    fall out of it are dropped. At the edge of the loaded items ``load_more`` is
+    called to fetch the next page. With ``anchor='end'`` the list behaves like a
+    chat: it stays pinned to its last items and loads older ones at the top.
+    """
+
+    def __init__(self, list_view, build, key=lambda item: item['id'], size=150, step=50, anchor='start', load_more=None, edge=100):
+        super().__init__(list_view, build, key)
+        self.size, self.step, self.anchor, self.load_more, self.edge = size, step, anchor, load_more, edge
+        self.all_items = []; self.keys = set(); self.start = 0; self.pinned = True; self.loading = False
+        self.frame = ((), (), None, False)  # header, footer, empty, has_more
+        list_view.on_scroll = self.on_scroll; list_view.scroll_interval = 100
+
+    def sync(self, items, header=(), footer=(), empty=None, has_more=False):
+        first = self.items[0] if self.items else None
+        self.all_items = list(items); self.keys = {self.key(item) for item in items}
+        self.frame = (tuple(header), tuple(footer), empty, has_more)
+        older = self.loading and self.anchor == 'end' and first is not None
+        if first is None or (self.pinned and not self.loading):
+            start = 0 if self.anchor == 'start' else len(items)
+        else: start = next((n for n, item in enumerate(items) if self.key(item) == self.key(first)), 0)
+        # A page fetched at the far edge is brought into view straight away.
+        if self.loading: start += self.step if self.anchor == 'start' else -self.step
+        self.loading = False
+        self.render(start)
+        # The older page is read from the top, so the list must not jump back to the newest items.
+        if older: self.pinned = False; self.list_view.auto_scroll = False
+
+    def render(self, start):
+        header, footer, empty, _ = self.frame
+        self.start = max(0, min(start, len(self.all_items) - self.size)); end = self.start + self.size
+        self.pinned = self.start == 0 if self.anchor == 'start' else end >= len(self.all_items)
+        if self.anchor == 'end': self.list_view.auto_scroll = self.pinned
+        super().sync(self.all_items[self.start:end], header if self.start == 0 else (), footer if end >= len(self.all_items) else (), empty)
+
+    def append(self, item):
+        key = self.key(item)
+        if key in self.keys: return
+        at_end = self.start + self.size >= len(self.all_items)
+        self.keys.add(key); self.all_items.append(item)
+        if at_end: self.render(len(self.all_items) if self.anchor == 'end' else self.start)
+
+    def placeholder(self, *controls):
+        self.all_items = []; self.keys = set(); self.start = 0; self.pinned = True; self.loading = False
+        super().placeholder(*controls)
+
+    def more(self, e=None):
+        if self.loading or not self.load_more: return
+        self.loading = True
+        self.load_more(e or True)
+
+    def on_scroll(self, e):
+        if e.pixels <= e.min_scroll_extent + self.edge: self.slide(-1, e)
+        elif e.pixels >= e.max_scroll_extent - self.edge: self.slide(1, e)
+
+    def slide(self, direction, e=None):
+        if self.loading: return
+        at_edge = self.start == 0 if direction < 0 else self.start + self.size >= len(self.all_items)
+        if not at_edge:
+            self.render(self.start + direction * self.step)
+            self.list_view.update()
+        elif self.frame[3] and (direction < 0) == (self.anchor == 'end'): self.more(e)
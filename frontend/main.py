@@ -1,9 +1,16 @@
 import flet as ft
 import requests
 import json
+import os
+import threading
 from datetime import datetime
+from urllib.parse import quote
+from api_client import ApiClient
+from keyed_list import KeyedListView, WindowedListView
+from search_index import SearchIndex
 
-API_BASE_URL = "https://3rkls769-5001.use.devtunnels.ms/api"
+API_BASE_URL = os.environ.get("PEERSTUDY_API_URL", "https://3rkls769-5001.use.devtunnels.ms/api")
+API_TIMEOUT = (5, 30)
 
 class ChatBubble(ft.Row):
     def __init__(self, author: str, text: str, is_me: bool):
@@ -26,7 +33,33 @@ class ChatBubble(ft.Row):
         
         self.controls = [bubble]
 
+class EventListener:
+    """One run of a group's event stream; stop() ends it and closes its connection."""
+
+    def __init__(self, group_id):
+        self.group_id = group_id; self.stopped = threading.Event(); self.response = None
+
+    def stop(self):
+        self.stopped.set()
+        if self.response is not None: self.response.close()
+
+def group_store_field(name):
+    return property(lambda self: self.store[name], lambda self, value: self.store.__setitem__(name, value))
+
+def new_group_store():
+    return {'token': None, 'notes': [], 'meetups': [], 'chat': [], 'chat_ids': set(), 'notes_before': None, 'meetups_before': None, 'meetups_after': None, 'chat_before': None,
+            'notes_index': SearchIndex(('title', 'content')), 'meetups_index': SearchIndex(('topic', 'description'))}
+
 class NoteSharingApp:
+    # Per-group client state lives in self.group_stores so returning to a group
+    # only needs a /sync delta; these attributes read and write the open group's store.
+    sync_token = group_store_field('token')
+    all_notes = group_store_field('notes'); all_meetups = group_store_field('meetups'); all_chat = group_store_field('chat')
+    chat_ids = group_store_field('chat_ids')
+    notes_index = group_store_field('notes_index'); meetups_index = group_store_field('meetups_index')
+    notes_before = group_store_field('notes_before'); chat_before = group_store_field('chat_before')
+    meetups_before = group_store_field('meetups_before'); meetups_after = group_store_field('meetups_after')
+
     def __init__(self, page: ft.Page):
         self.page = page
         self.page.title = "PeerStudy"
@@ -36,37 +69,53 @@ class NoteSharingApp:
         self.page.theme_mode = ft.ThemeMode.SYSTEM
         
         self.current_group_id = None; self.current_group_name = ""
-        self.all_notes = []; self.all_meetups = []
+        self.group_stores = {}; self.store = new_group_store()
+        self.event_listener = None; self.load_generation = 0
+        self.group_title = ft.Text("")
+        self.client = ApiClient(API_BASE_URL, timeout=API_TIMEOUT)
+        self.search_timers = {}; self.search_terms = {}
         
         self.notes_list = ft.ListView(expand=True, spacing=10)
         self.meetups_list = ft.ListView(expand=True, spacing=10)
         self.chat_list = ft.ListView(expand=True, spacing=15, auto_scroll=True)
         self.dashboard_groups_list = ft.ListView(expand=True, spacing=10)
+        # Long lists only keep a window of rows as controls and page in more from the server while scrolling.
+        self.notes_rows = WindowedListView(self.notes_list, self.note_card, load_more=self.load_group_notes)
+        self.meetups_rows = WindowedListView(self.meetups_list, self.meetup_card, load_more=self.load_group_meetups)
+        self.chat_rows = WindowedListView(self.chat_list, self.chat_bubble, anchor='end', load_more=self.load_group_chat)
+        self.dashboard_rows = KeyedListView(self.dashboard_groups_list, self.group_card)
+        self.notes_more = ft.TextButton("Load more", on_click=self.notes_rows.more); self.meetups_more = ft.TextButton("Load more", on_click=self.meetups_rows.more)
+        self.meetups_past = ft.TextButton("Show past sessions", on_click=self.load_past_meetups)
+        self.chat_older = ft.TextButton("Load older messages", on_click=self.chat_rows.more)
         self.group_fab = ft.FloatingActionButton(icon=ft.Icons.ADD, on_click=self.on_group_fab_click, tooltip="Add Item")
         self.chat_input_row = ft.Row(visible=False)
         self.group_tabs = ft.Tabs(selected_index=0, animation_duration=300, on_change=self.on_tab_change, expand=True)
 
         self.page.on_route_change = self.route_change
         self.page.on_view_pop = self.view_pop
-        self.page.pubsub.subscribe(self.on_pubsub_message)
         self.page.go("/login")
 
     def api_call(self, method, endpoint, data=None):
-        token = self.page.client_storage.get("auth_token")
-        headers = {'Authorization': f'Bearer {token}'} if token else {}
-        headers['Content-Type'] = 'application/json'
-        try:
-            response = requests.request(method.upper(), url=f"{API_BASE_URL}{endpoint}", json=data, headers=headers)
-            response.raise_for_status()
-            return (response.json() if response.content else {"success": True}), None
-        except requests.exceptions.RequestException as e:
-            error_message = f"API Error: {e}"
-            if e.response is not None:
-                try: 
-                    error_data = e.response.json()
-                    error_message = error_data.get('message', error_data.get('msg', str(e)))
-                except json.JSONDecodeError: pass
-            return None, error_message
+        return self.client.request(method, endpoint, data, token=self.page.client_storage.get("auth_token"))
+
+    def run_background(self, work, apply, cancellable=True):
+        """Run ``work()`` off the event handler, then ``apply(result)`` followed by a single page.update().
+
+        Cancellable results are dropped if the user has navigated since the call was made.
+        """
+        generation = self.load_generation
+        def task():
+            result = work()
+            if cancellable and generation != self.load_generation: return
+            apply(result)
+            self.page.update()
+        self.page.run_thread(task)
+
+    def api_background(self, method, endpoint, apply, data=None, cancellable=True):
+        self.run_background(lambda: self.api_call(method, endpoint, data), lambda result: apply(*result), cancellable)
+
+    def show_loading(self, *keyed_lists):
+        for rows in keyed_lists: rows.placeholder(ft.Container(ft.ProgressRing(), alignment=ft.alignment.center, padding=20))
 
     def show_error_dialog(self, message: str):
         error_dialog = ft.AlertDialog(
@@ -96,13 +145,109 @@ class NoteSharingApp:
             self.page.dialog = None
             self.page.update()
 
-    def on_pubsub_message(self, message):
-        try:
-            if int(message) == self.current_group_id:
-                self.load_group_notes(); self.load_group_meetups(); self.load_group_chat()
-        except (ValueError, TypeError) as e: print(f"Error processing pubsub message: {message}. Error: {e}")
+    def start_group_events(self):
+        if self.event_listener and self.event_listener.group_id == self.current_group_id: return
+        self.stop_group_events()
+        self.event_listener = EventListener(self.current_group_id)
+        threading.Thread(target=self.listen_group_events, args=(self.event_listener,), daemon=True).start()
+
+    def stop_group_events(self):
+        if self.event_listener: self.event_listener.stop(); self.event_listener = None
+
+    def listen_group_events(self, listener):
+        group_id = listener.group_id
+        while not listener.stopped.is_set():
+            token = self.page.client_storage.get("auth_token")
+            try:
+                with self.client.stream(f"/groups/{group_id}/events", token=token) as response:
+                    listener.response = response
+                    if listener.stopped.is_set(): return
+                    response.raise_for_status()
+                    event_type = None
+                    for line in response.iter_lines(decode_unicode=True):
+                        if listener.stopped.is_set(): return
+                        if line.startswith('event:'): event_type = line[6:].strip()
+                        elif line.startswith('data:') and event_type: self.on_group_event(event_type, json.loads(line[5:]))
+                        elif not line: event_type = None
+            except Exception as e:
+                if listener.stopped.is_set(): return  # the response was closed by stop()
+                if not isinstance(e, (requests.exceptions.RequestException, json.JSONDecodeError)): raise
+                print(f"Event stream for group {group_id} dropped: {e}")
+                listener.stopped.wait(2)
+
+    def on_group_event(self, event_type, data):
+        if event_type == 'chat_message': self.append_chat_message(data)
+        elif event_type == 'note':
+            self.merge_items(self.all_notes, [data], key=lambda n: (n['created_at'], n['id']), reverse=True)
+            self.show_notes()
+        elif event_type == 'meetup':
+            self.merge_items(self.all_meetups, [data], key=lambda m: (m['time'], m['id']))
+            self.show_meetups()
+        elif event_type == 'resync': self.open_group()
+        self.page.update()
+
+    def append_chat_message(self, msg):
+        if msg['id'] in self.chat_ids: return
+        self.chat_ids.add(msg['id']); self.all_chat.append(msg)
+        self.chat_rows.append(msg)
+        self.page.update()
+
+    @staticmethod
+    def merge_items(items, new_items, key, reverse=False):
+        merged = {item['id']: item for item in items}
+        merged.update((item['id'], item) for item in new_items)
+        items[:] = sorted(merged.values(), key=key, reverse=reverse)
+
+    def open_group(self):
+        group_id = self.current_group_id
+        self.store = self.group_stores.setdefault(group_id, new_group_store())
+        since = self.sync_token
+        # Paint whatever is already known right away; the network work happens in the background.
+        if since is None: self.show_loading(self.notes_rows, self.meetups_rows, self.chat_rows)
+        else: self.render_group()
+        def fetch():
+            if since is not None:
+                delta, _ = self.api_call('GET', f'/groups/{group_id}/sync?since={since}')
+                if delta and not delta['reset']: return 'sync', delta, None
+            return ('bootstrap', *self.api_call('GET', f'/groups/{group_id}/bootstrap'))
+        self.run_background(fetch, lambda result: self.apply_group_load(*result))
+
+    def apply_group_load(self, kind, data, error):
+        if kind == 'sync':
+            self.apply_sync(data)
+            return
+        if error:
+            self.show_error_dialog(f"Failed to load group: {error}")
+            return
+        self.current_group_name = self.group_title.value = data['group']['name']
+        self.all_notes, self.notes_before = data['notes']['items'], data['notes']['before']
+        self.all_meetups, self.meetups_before, self.meetups_after = data['meetups']['items'], data['meetups']['before'], data['meetups']['after']
+        self.all_chat, self.chat_before = data['chat']['items'], data['chat']['before']
+        self.chat_ids = {msg['id'] for msg in self.all_chat}
+        self.sync_token = data['token']
+        self.render_group()
+
+    def apply_sync(self, delta):
+        if any(d['type'] == 'group' for d in delta['deleted']):
+            self.group_stores.pop(self.current_group_id, None)
+            self.show_success_snackbar("This group no longer exists.")
+            self.page.go("/dashboard")
+            return
+        self.merge_items(self.all_notes, delta['notes'], key=lambda n: (n['created_at'], n['id']), reverse=True)
+        self.merge_items(self.all_meetups, delta['meetups'], key=lambda m: (m['time'], m['id']))
+        self.merge_items(self.all_chat, delta['chat'], key=lambda msg: msg['id'])
+        self.chat_ids.update(msg['id'] for msg in delta['chat'])
+        self.sync_token = delta['token']
+        self.render_group()
+
+    def render_group(self):
+        self.show_notes()
+        self.show_meetups()
+        self.populate_chat_list()
 
     def get_group_view(self):
+        self.group_title.value = self.current_group_name
+        self.search_terms.clear()
         new_chat_message = ft.TextField(hint_text="Type a message...", expand=True, on_submit=self.send_chat_message, border_radius=20)
         self.chat_input_row.controls = [new_chat_message, ft.IconButton(icon=ft.Icons.SEND_ROUNDED, on_click=self.send_chat_message, tooltip="Send Message")]
         search_notes_field = ft.TextField(hint_text="Search resources...", on_change=self.on_search_notes, border_radius=20, prefix_icon=ft.Icons.SEARCH)
@@ -113,7 +258,7 @@ class NoteSharingApp:
             ft.Tab(text="Group Chat", content=self.chat_list)]
         main_column = ft.Column([self.group_tabs, self.chat_input_row], expand=True)
         return ft.View(f"/group/{self.current_group_id}", [
-            ft.AppBar(title=ft.Text(self.current_group_name), bgcolor="surfaceVariant", 
+            ft.AppBar(title=self.group_title, bgcolor="surfaceVariant", 
                 leading=ft.IconButton(ft.Icons.ARROW_BACK, on_click=lambda _: self.page.go("/dashboard")),
                 actions=[ft.IconButton(ft.Icons.LOGOUT, on_click=self.confirm_leave_group, tooltip="Leave Group", icon_color=ft.Colors.RED)]
             ), ft.Container(content=main_column, expand=True, padding=ft.padding.symmetric(horizontal=20))
@@ -121,12 +266,15 @@ class NoteSharingApp:
 
     def _handle_leave_action(self, e):
         self.close_dialog()
-        _, error = self.api_call('POST', f'/groups/{self.current_group_id}/leave')
-        if not error:
-            self.show_success_snackbar("You have left the group.")
-            self.page.go("/dashboard")
-        else:
-            self.show_error_dialog(f"Failed to leave group: {error}")
+        group_id = self.current_group_id
+        def on_left(_, error):
+            if not error:
+                self.group_stores.pop(group_id, None)
+                self.show_success_snackbar("You have left the group.")
+                self.page.go("/dashboard")
+            else:
+                self.show_error_dialog(f"Failed to leave group: {error}")
+        self.api_background('POST', f'/groups/{group_id}/leave', on_left, cancellable=False)
 
     def confirm_leave_group(self, e):
         dialog = ft.AlertDialog(
@@ -160,69 +308,129 @@ class NoteSharingApp:
             if chat_message_field and chat_message_field.value:
                 text = chat_message_field.value
                 chat_message_field.value = ""; chat_message_field.focus()
-                _, error = self.api_call('POST', f'/groups/{self.current_group_id}/chat', data={"text": text})
-                if not error: self.page.pubsub.send_all(str(self.current_group_id))
-                else: self.show_error_dialog(f"Failed to send: {error}")
+                group_id = self.current_group_id
+                def on_sent(message, error):
+                    if error: self.show_error_dialog(f"Failed to send: {error}")
+                    elif self.current_group_id == group_id: self.append_chat_message(message)
+                self.api_background('POST', f'/groups/{group_id}/chat', on_sent, data={"text": text}, cancellable=False)
                 self.page.update()
 
-    def on_search_notes(self, e):
-        search_term = e.control.value.lower()
-        if not search_term: self.populate_notes_list(self.all_notes)
-        else: self.populate_notes_list([n for n in self.all_notes if search_term in n['title'].lower() or search_term in n['content'].lower()])
-
-    def on_search_meetups(self, e):
-        search_term = e.control.value.lower()
-        if not search_term: self.populate_meetups_list(self.all_meetups)
-        else: self.populate_meetups_list([m for m in self.all_meetups if search_term in m['topic'].lower() or (m.get('description') and search_term in m['description'].lower())])
-
-    def populate_notes_list(self, notes_data):
-        self.notes_list.controls.clear()
-        if notes_data:
-            for n in notes_data: self.notes_list.controls.append(ft.Card(ft.ListTile(title=ft.Text(n['title'], weight=ft.FontWeight.BOLD), subtitle=ft.Text(n['content']))))
-        else: self.notes_list.controls.append(ft.Text("No resources found.", italic=True, text_align=ft.TextAlign.CENTER))
-        self.page.update()
-
-    def populate_meetups_list(self, meetups_data):
-        self.meetups_list.controls.clear()
-        if meetups_data:
-            for m in meetups_data:
-                time = datetime.fromisoformat(m['time']).astimezone().strftime('%A, %b %d @ %I:%M %p %Z')
-                self.meetups_list.controls.append(ft.Card(ft.ListTile(leading=ft.Icon(ft.Icons.CALENDAR_MONTH), title=ft.Text(m['topic'], weight=ft.FontWeight.BOLD), subtitle=ft.Text(f"{time}\n{m['description']}"), trailing=ft.IconButton(ft.Icons.LINK, url=m['link'], disabled=not m['link'], tooltip="Join Meeting"))))
-        else: self.meetups_list.controls.append(ft.Text("No study sessions found.", italic=True, text_align=ft.TextAlign.CENTER))
-        self.page.update()
-
-    def load_group_notes(self):
-        self.all_notes, _ = self.api_call('GET', f'/groups/{self.current_group_id}/notes')
-        self.populate_notes_list(self.all_notes or [])
-
-    def load_group_meetups(self):
-        self.all_meetups, _ = self.api_call('GET', f'/groups/{self.current_group_id}/meetups')
-        self.populate_meetups_list(self.all_meetups or [])
-
-    def load_group_chat(self):
-        self.chat_list.controls.clear()
-        data, _ = self.api_call('GET', f'/groups/{self.current_group_id}/chat')
-        if data:
-            current_username = self.page.client_storage.get("username")
-            for msg in data: self.chat_list.controls.append(ChatBubble(author=msg['author'], text=msg['text'], is_me=(current_username == msg['author'])))
+    def show_notes(self):
+        term = self.search_terms.get('notes')
+        if not term: return self.populate_notes_list(self.all_notes, has_more=bool(self.notes_before))
+        self.notes_index.update(self.all_notes)
+        self.populate_notes_list(self.notes_index.filter(self.all_notes, term))
+
+    def show_meetups(self):
+        term = self.search_terms.get('meetups')
+        if not term: return self.populate_meetups_list(self.all_meetups, has_more=bool(self.meetups_after), has_past=bool(self.meetups_before))
+        self.meetups_index.update(self.all_meetups)
+        self.populate_meetups_list(self.meetups_index.filter(self.all_meetups, term))
+
+    def debounce_search(self, collection, term, delay=0.3):
+        # Loaded items are filtered through the client index on every keystroke;
+        # the server, which also covers pages not loaded yet, is asked once typing pauses.
+        timer = self.search_timers.pop(collection, None)
+        if timer: timer.cancel()
+        self.search_terms[collection] = term
+        (self.show_notes if collection == 'notes' else self.show_meetups)()
         self.page.update()
+        if not term: return
+        self.search_timers[collection] = threading.Timer(delay, self.run_search, args=(collection, term))
+        self.search_timers[collection].start()
+
+    def run_search(self, collection, term):
+        populate = self.populate_notes_list if collection == 'notes' else self.populate_meetups_list
+        def apply(result, error):
+            # Stale answers are dropped; on errors the local results stay up.
+            if self.search_terms.get(collection) != term or error: return
+            populate(result[collection]['items'])
+        self.api_background('GET', f'/groups/{self.current_group_id}/search?type={collection}&q={quote(term)}', apply)
+
+    def on_search_notes(self, e): self.debounce_search('notes', e.control.value.strip())
+
+    def on_search_meetups(self, e): self.debounce_search('meetups', e.control.value.strip())
+
+    def note_card(self, n):
+        return ft.Card(ft.ListTile(title=ft.Text(n['title'], weight=ft.FontWeight.BOLD), subtitle=ft.Text(n['content'])))
+
+    def meetup_card(self, m):
+        time = datetime.fromisoformat(m['time']).astimezone().strftime('%A, %b %d @ %I:%M %p %Z')
+        return ft.Card(ft.ListTile(leading=ft.Icon(ft.Icons.CALENDAR_MONTH), title=ft.Text(m['topic'], weight=ft.FontWeight.BOLD), subtitle=ft.Text(f"{time}\n{m['description']}"), trailing=ft.IconButton(ft.Icons.LINK, url=m['link'], disabled=not m['link'], tooltip="Join Meeting")))
+
+    def chat_bubble(self, msg):
+        return ChatBubble(author=msg['author'], text=msg['text'], is_me=(self.page.client_storage.get("username") == msg['author']))
+
+    def populate_notes_list(self, notes_data, has_more=False):
+        self.notes_rows.sync(notes_data, footer=[self.notes_more] if has_more else [], has_more=has_more, empty=ft.Text("No resources found.", italic=True, text_align=ft.TextAlign.CENTER))
+
+    def populate_meetups_list(self, meetups_data, has_more=False, has_past=False):
+        self.meetups_rows.sync(meetups_data, header=[self.meetups_past] if has_past else [], footer=[self.meetups_more] if has_more else [], has_more=has_more, empty=ft.Text("No study sessions found.", italic=True, text_align=ft.TextAlign.CENTER))
+
+    def load_group_notes(self, e=None):
+        query = f'?before={self.notes_before}' if e and self.notes_before else ''
+        def apply(page, _):
+            items = page['items'] if page else []
+            if query: self.merge_items(self.all_notes, items, key=lambda n: (n['created_at'], n['id']), reverse=True)
+            else: self.all_notes = items
+            if page: self.notes_before = page['before']
+            self.show_notes()
+        self.api_background('GET', f'/groups/{self.current_group_id}/notes{query}', apply)
+
+    def load_group_meetups(self, e=None):
+        query = f'?after={self.meetups_after}' if e and self.meetups_after else ''
+        def apply(page, _):
+            items = page['items'] if page else []
+            if query: self.merge_items(self.all_meetups, items, key=lambda m: (m['time'], m['id']))
+            else: self.all_meetups = items
+            if page: self.meetups_after = page['after']
+            # The first page starts at today's sessions; its before cursor leads to past ones.
+            if page and not query: self.meetups_before = page['before']
+            self.show_meetups()
+        self.api_background('GET', f'/groups/{self.current_group_id}/meetups{query}', apply)
+
+    def load_past_meetups(self, e=None):
+        if not self.meetups_before: return
+        def apply(page, _):
+            if not page: return
+            self.merge_items(self.all_meetups, page['items'], key=lambda m: (m['time'], m['id']))
+            self.meetups_before = page['before']
+            self.show_meetups()
+        self.api_background('GET', f'/groups/{self.current_group_id}/meetups?before={self.meetups_before}', apply)
+
+    def load_group_chat(self, e=None):
+        older = bool(e and self.chat_before)
+        def apply(page, _):
+            items = page['items'] if page else []
+            if older: self.merge_items(self.all_chat, items, key=lambda msg: msg['id'])
+            else: self.all_chat = items
+            self.chat_ids = {msg['id'] for msg in self.all_chat}
+            if page: self.chat_before = page['before']
+            self.populate_chat_list()
+        self.api_background('GET', f'/groups/{self.current_group_id}/chat' + (f'?before={self.chat_before}' if older else ''), apply)
+
+    def populate_chat_list(self):
+        self.chat_rows.sync(self.all_chat, header=[self.chat_older] if self.chat_before else [], has_more=bool(self.chat_before))
 
     def load_dashboard_groups(self):
-        self.dashboard_groups_list.controls.clear()
-        data, error = self.api_call('GET', '/groups')
-        if error: self.show_error_dialog(error)
-        elif data:
-            for group in data:
-                card_content = ft.Column([
-                    ft.ListTile(leading=ft.Icon(ft.Icons.GROUP_WORK_OUTLINED), title=ft.Text(group['name'], weight=ft.FontWeight.BOLD), subtitle=ft.Text(f"{group['course_code']} - {group['member_count']} member(s)"), on_click=lambda _, g=group: self.on_group_click(g)),
-                    ft.Container(content=ft.Row([ft.Text("Share Code:", weight=ft.FontWeight.W_500), ft.Text(group.get('join_code'), selectable=True, font_family="monospace"), ft.IconButton(ft.Icons.COPY, on_click=lambda _, c=group.get('join_code'): self.copy_to_clipboard(c), tooltip="Copy Code")], alignment=ft.MainAxisAlignment.END), padding=ft.padding.only(right=15, bottom=5))])
-                self.dashboard_groups_list.controls.append(ft.Card(content=card_content))
-        else: self.dashboard_groups_list.controls.append(ft.Container(content=ft.Column([
+        self.show_loading(self.dashboard_rows)
+        self.api_background('GET', '/groups', self.populate_dashboard_groups)
+
+    def group_card(self, group):
+        return ft.Card(content=ft.Column([
+            ft.ListTile(leading=ft.Icon(ft.Icons.GROUP_WORK_OUTLINED), title=ft.Text(group['name'], weight=ft.FontWeight.BOLD), subtitle=ft.Text(f"{group['course_code']} - {group['member_count']} member(s)"), on_click=lambda _, g=group: self.on_group_click(g)),
+            ft.Container(content=ft.Row([ft.Text("Share Code:", weight=ft.FontWeight.W_500), ft.Text(group.get('join_code'), selectable=True, font_family="monospace"), ft.IconButton(ft.Icons.COPY, on_click=lambda _, c=group.get('join_code'): self.copy_to_clipboard(c), tooltip="Copy Code")], alignment=ft.MainAxisAlignment.END), padding=ft.padding.only(right=15, bottom=5))]))
+
+    def populate_dashboard_groups(self, data, error):
+        if error:
+            self.dashboard_rows.placeholder()
+            self.show_error_dialog(error)
+            return
+        self.dashboard_rows.sync(data or [], empty=ft.Container(content=ft.Column([
                 ft.Icon(ft.Icons.GROUP_ADD_OUTLINED, size=60, color="onSurfaceVariant"),
                 ft.Text("No study groups yet.", size=20, weight=ft.FontWeight.BOLD),
                 ft.Text("Create a new group or join one with a code."),
             ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10), alignment=ft.alignment.center, expand=True))
-        self.page.update()
 
     def get_dashboard_view(self):
         return ft.View("/dashboard", [
@@ -247,9 +455,10 @@ class NoteSharingApp:
         title_field = ft.TextField(label="Resource Title", autofocus=True); content_field = ft.TextField(label="Content / Description / Link", multiline=True, min_lines=3)
         def add_click(e):
             if not title_field.value: return
-            _, error = self.api_call('POST', f'/groups/{self.current_group_id}/notes', data={"title": title_field.value, "content": content_field.value})
-            if not error: self.page.go(f"/group/{self.current_group_id}")
-            else: self.show_error_dialog(error)
+            def on_added(_, error):
+                if not error: self.page.go(f"/group/{self.current_group_id}")
+                else: self.show_error_dialog(error)
+            self.api_background('POST', f'/groups/{self.current_group_id}/notes', on_added, data={"title": title_field.value, "content": content_field.value}, cancellable=False)
         return ft.View(f"/group/{self.current_group_id}/add-note", [ft.AppBar(title=ft.Text("Share Resource"), bgcolor="surfaceVariant", leading=ft.IconButton(ft.Icons.ARROW_BACK, on_click=lambda _: self.page.go(f"/group/{self.current_group_id}"))), ft.Column([title_field, content_field, ft.FilledButton("Share", on_click=add_click)], alignment=ft.MainAxisAlignment.CENTER, horizontal_alignment=ft.CrossAxisAlignment.CENTER, expand=True, spacing=20)])
 
     def get_add_meetup_view(self):
@@ -257,9 +466,10 @@ class NoteSharingApp:
         def add_click(e):
             if not all([topic_field.value, time_field.value]): return
             data = {"topic": topic_field.value, "time": time_field.value, "link": link_field.value, "description": desc_field.value}
-            _, error = self.api_call('POST', f'/groups/{self.current_group_id}/meetups', data=data)
-            if not error: self.page.go(f"/group/{self.current_group_id}")
-            else: self.show_error_dialog(error)
+            def on_added(_, error):
+                if not error: self.page.go(f"/group/{self.current_group_id}")
+                else: self.show_error_dialog(error)
+            self.api_background('POST', f'/groups/{self.current_group_id}/meetups', on_added, data=data, cancellable=False)
         return ft.View(f"/group/{self.current_group_id}/add-meetup", [ft.AppBar(title=ft.Text("Schedule Session"), bgcolor="surfaceVariant", leading=ft.IconButton(ft.Icons.ARROW_BACK, on_click=lambda _: self.page.go(f"/group/{self.current_group_id}"))), ft.Column([topic_field, time_field, link_field, desc_field, ft.FilledButton("Schedule", on_click=add_click)], alignment=ft.MainAxisAlignment.CENTER, horizontal_alignment=ft.CrossAxisAlignment.CENTER, expand=True, spacing=20)])
 
     def copy_to_clipboard(self, text): 
@@ -270,20 +480,22 @@ class NoteSharingApp:
         name_field = ft.TextField(label="Group Name", autofocus=True); course_field = ft.TextField(label="Course/Topic"); desc_field = ft.TextField(label="Description", multiline=True)
         def create_click(e):
             if not name_field.value: return
-            _, error = self.api_call('POST', '/groups', data={"name": name_field.value, "course_code": course_field.value, "description": desc_field.value})
-            if not error: self.page.go("/dashboard")
-            else: self.show_error_dialog(error)
+            def on_created(_, error):
+                if not error: self.page.go("/dashboard")
+                else: self.show_error_dialog(error)
+            self.api_background('POST', '/groups', on_created, data={"name": name_field.value, "course_code": course_field.value, "description": desc_field.value}, cancellable=False)
         return ft.View("/create-group", [ft.AppBar(title=ft.Text("Create Group"), bgcolor="surfaceVariant", leading=ft.IconButton(ft.Icons.ARROW_BACK, on_click=lambda _: self.page.go("/dashboard"))), ft.Column([name_field, course_field, desc_field, ft.FilledButton("Create", on_click=create_click)], alignment=ft.MainAxisAlignment.CENTER, horizontal_alignment=ft.CrossAxisAlignment.CENTER, expand=True, spacing=20)])
 
     def get_join_group_view(self):
         code_field = ft.TextField(label="Enter Join Code", autofocus=True)
         def join_click(e):
             if not code_field.value: return
-            result, error = self.api_call('POST', '/groups/join', data={"join_code": code_field.value})
-            if result and not error: 
-                self.show_success_snackbar(result.get("message"))
-                self.page.go("/dashboard")
-            else: self.show_error_dialog(error)
+            def on_joined(result, error):
+                if result and not error: 
+                    self.show_success_snackbar(result.get("message"))
+                    self.page.go("/dashboard")
+                else: self.show_error_dialog(error)
+            self.api_background('POST', '/groups/join', on_joined, data={"join_code": code_field.value}, cancellable=False)
         return ft.View("/join-group", [ft.AppBar(title=ft.Text("Join Group"), bgcolor="surfaceVariant", leading=ft.IconButton(ft.Icons.ARROW_BACK, on_click=lambda _: self.page.go("/dashboard"))), ft.Column([code_field, ft.FilledButton("Join", on_click=join_click)], alignment=ft.MainAxisAlignment.CENTER, horizontal_alignment=ft.CrossAxisAlignment.CENTER, expand=True, spacing=20)])
     
     def get_login_view(self):
@@ -292,12 +504,13 @@ class NoteSharingApp:
             if not all([username_field.value, password_field.value]): 
                 self.show_error_dialog("Please enter both username and password.")
                 return
-            result, error = self.api_call('POST', '/login', data={"username": username_field.value, "password": password_field.value})
-            if result and 'user_id' in result:
-                self.page.client_storage.set("auth_token", result['access_token']); self.page.client_storage.set("user_id", result['user_id']); self.page.client_storage.set("username", username_field.value)
-                self.show_success_snackbar("Login successful!")
-                self.page.go("/dashboard")
-            else: self.show_error_dialog(error or "Incorrect username or password.")
+            def on_login(result, error):
+                if result and 'user_id' in result:
+                    self.page.client_storage.set("auth_token", result['access_token']); self.page.client_storage.set("user_id", result['user_id']); self.page.client_storage.set("username", username_field.value)
+                    self.show_success_snackbar("Login successful!")
+                    self.page.go("/dashboard")
+                else: self.show_error_dialog(error or "Incorrect username or password.")
+            self.api_background('POST', '/login', on_login, data={"username": username_field.value, "password": password_field.value}, cancellable=False)
         return ft.View("/login", [
             ft.Column([
                 ft.Text("PeerStudy", theme_style=ft.TextThemeStyle.HEADLINE_LARGE, color="primary"), 
@@ -313,11 +526,12 @@ class NoteSharingApp:
             if not all([username_field.value, email_field.value, password_field.value]): 
                 self.show_error_dialog("All fields are required.")
                 return
-            _, error = self.api_call('POST', '/register', data={"username": username_field.value, "email": email_field.value, "password": password_field.value})
-            if not error: 
-                self.show_success_snackbar("Registration successful! Please log in.")
-                self.page.go("/login")
-            else: self.show_error_dialog(error or "An unknown registration error occurred.")
+            def on_registered(_, error):
+                if not error: 
+                    self.show_success_snackbar("Registration successful! Please log in.")
+                    self.page.go("/login")
+                else: self.show_error_dialog(error or "An unknown registration error occurred.")
+            self.api_background('POST', '/register', on_registered, data={"username": username_field.value, "email": email_field.value, "password": password_field.value}, cancellable=False)
         return ft.View("/register", [
             ft.Column([
                 ft.Text("Create Account", theme_style=ft.TextThemeStyle.HEADLINE_LARGE, color="primary"), 
@@ -328,8 +542,9 @@ class NoteSharingApp:
         ], vertical_alignment=ft.MainAxisAlignment.CENTER, horizontal_alignment=ft.CrossAxisAlignment.CENTER)
     
     def on_group_click(self, group): self.current_group_id = group['id']; self.current_group_name = group['name']; self.page.go(f"/group/{self.current_group_id}")
-    def logout(self, e): self.page.client_storage.clear(); self.page.go("/login")
+    def logout(self, e): self.stop_group_events(); self.client.clear_cache(); self.group_stores.clear(); self.chat_rows.placeholder(); self.page.client_storage.clear(); self.page.go("/login")
     def route_change(self, route):
+        self.load_generation += 1  # results of loads started for the previous route are discarded
         self.page.views.clear()
         token = self.page.client_storage.get("auth_token")
         is_auth_route = self.page.route in ["/login", "/register"]
@@ -344,19 +559,22 @@ class NoteSharingApp:
             self.page.views.append(self.get_register_view())
         elif token:
             self.group_fab.visible = True; self.chat_input_row.visible = False
+            if not self.page.route.startswith("/group/"): self.stop_group_events()
             if self.page.route == "/dashboard": self.load_dashboard_groups()
             elif self.page.route == "/create-group": self.page.views.append(self.get_create_group_view())
             elif self.page.route == "/join-group": self.page.views.append(self.get_join_group_view())
             elif self.page.route.startswith("/group/"):
                 parts = self.page.route.strip("/").split("/")
                 self.current_group_id = int(parts[1])
-                if not self.current_group_name or str(self.current_group_id) != parts[1]:
-                    group_data, _ = self.api_call('GET', f'/groups/{self.current_group_id}')
-                    if group_data: self.current_group_name = group_data.get('name', 'Group')
                 self.page.views.append(self.get_group_view())
+                if len(parts) == 2: self.open_group()
+                if not self.current_group_name:
+                    def on_details(group_data, _):
+                        if group_data: self.current_group_name = self.group_title.value = group_data.get('name', 'Group')
+                    self.api_background('GET', f'/groups/{self.current_group_id}', on_details)
                 if len(parts) > 2 and parts[2] == "add-note": self.page.views.append(self.get_add_note_view())
                 elif len(parts) > 2 and parts[2] == "add-meetup": self.page.views.append(self.get_add_meetup_view())
-                else: self.load_group_notes(); self.load_group_meetups(); self.load_group_chat()
+                self.start_group_events()
         else: self.page.go("/login")
         self.page.update()
 
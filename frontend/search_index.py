@@ -0,0 +1,60 @@
+import bisect
+import re
+
+def tokenize(text):
+    return re.findall(r'\w+', (text or '').lower())
+
+class SearchIndex:
+    """Inverted prefix index over the text fields of a list of item dicts.
+
+    Items are lowercased and tokenized once, when first seen or when they change;
+    ``update`` can be handed the whole list after every load and only re-indexes
+    the difference. A query matches items containing every term as a token
+    prefix, the same rule as the server's search endpoint.
+    """
+
+    def __init__(self, fields, key=lambda item: item['id']):
+        self.fields = fields; self.key = key
+        self.docs = {}         # key -> (item, tokens)
+        self.postings = {}     # token -> keys of the items containing it
+        self.vocabulary = []   # sorted tokens, for prefix ranges
+
+    def update(self, items):
+        seen = set()
+        for item in items:
+            key = self.key(item); seen.add(key)
+            doc = self.docs.get(key)
+            if doc and doc[0] == item: continue
+            if doc: self.remove(key)
+            self.add(key, item)
+        for key in self.docs.keys() - seen: self.remove(key)
+
+    def add(self, key, item):
+        tokens = {token for field in self.fields for token in tokenize(item.get(field))}
+        self.docs[key] = (item, tokens)
+        for token in tokens:
+            if token not in self.postings:
+                self.postings[token] = set(); bisect.insort(self.vocabulary, token)
+            self.postings[token].add(key)
+
+    def remove(self, key):
+        _, tokens = self.docs.pop(key)
+        for token in tokens:
+            self.postings[token].discard(key)
+            if not self.postings[token]:
+                del self.postings[token]; del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
+
+    def search(self, query):
+        """Keys of the items matching every term of ``query``."""
+        matches = None
+        for term in tokenize(query):
+            lo = bisect.bisect_left(self.vocabulary, term); hi = bisect.bisect_left(self.vocabulary, term + '\U0010ffff')
+            keys = set().union(*(self.postings[token] for token in self.vocabulary[lo:hi]))
+            matches = keys if matches is None else matches & keys
+            if not matches: break
+        return set(self.docs) if matches is None else matches
+
+    def filter(self, items, query):
+        """``items`` narrowed to the matches for ``query``, in their original order."""
+        keys = self.search(query)
+        return [item for item in items if self.key(item) in keys]
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The client modules import each other by bare name, as they do when main.py runs from frontend/.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+from keyed_list import WindowedListView
+
+class FakeListView(SimpleNamespace):
+    def __init__(self): super().__init__(controls=[], on_scroll=None, scroll_interval=None, auto_scroll=True)
+    def update(self): pass
+
+def messages(first, last): return [{'id': n} for n in range(first, last)]
+
+def test_older_chat_page_comes_into_view():
+    list_view = FakeListView(); pages = []
+    rows = WindowedListView(list_view, lambda item: item['id'], anchor='end', load_more=pages.append)
+    rows.sync(messages(50, 200), has_more=True)
+    assert list_view.controls == list(range(50, 200)) and list_view.auto_scroll
+
+    rows.more()
+    assert pages and rows.loading
+    rows.sync(messages(0, 200), has_more=False)
+    assert list_view.controls == list(range(0, 150))
+    assert not rows.pinned and not list_view.auto_scroll
+
+def test_older_page_of_a_short_chat_does_not_scroll_to_the_end():
+    list_view = FakeListView()
+    rows = WindowedListView(list_view, lambda item: item['id'], anchor='end', load_more=lambda e: None)
+    rows.sync(messages(50, 100), has_more=True)
+    rows.more(); rows.sync(messages(0, 100))
+    assert list_view.controls == list(range(0, 100)) and not list_view.auto_scroll